@@ -0,0 +1,63 @@
+"""Compact JSON encoding shared by the skill tool executor and the telemetry sinks.
+
+Uses orjson when the `speedups` extra is installed and the stdlib otherwise; both paths
+produce the same text: compact separators, UTF-8 (no ASCII escaping), and non-finite
+floats (NaN/Infinity) written as `null` - orjson's behaviour, and valid JSON either way.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator (pip install ah32[speedups])
+    orjson = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+def _finite(obj: Any) -> Any:
+    """Copy of <obj> with NaN/Infinity floats replaced by None (stdlib path only)."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def _encode(obj: Any, indent: bool) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # orjson rejects some inputs json accepts (>64-bit ints, str subclasses as keys).
+            logger.debug("[json] orjson encode failed, using json", exc_info=True)
+    layout: dict = {"indent": 2} if indent else {"separators": (",", ":")}
+    try:
+        text = json.dumps(obj, ensure_ascii=False, allow_nan=False, **layout)
+    except ValueError:
+        # Rare: only payloads carrying NaN/Infinity pay for the copy.
+        text = json.dumps(_finite(obj), ensure_ascii=False, **layout)
+    return text.encode("utf-8")
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Encode <obj> as UTF-8 JSON bytes. Raises TypeError/ValueError like json.dumps."""
+    return _encode(obj, False)
+
+
+def dumps(obj: Any) -> str:
+    """Encode <obj> as a JSON string (see dumps_bytes)."""
+    return _encode(obj, False).decode("utf-8")
+
+
+def dumps_indented(obj: Any) -> str:
+    """Encode <obj> as a 2-space indented JSON string, for logs and human-facing text."""
+    return _encode(obj, True).decode("utf-8")
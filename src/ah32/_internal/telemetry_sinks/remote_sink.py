@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
 import logging
 from dataclasses import dataclass
 from typing import Any, Dict, List
 from urllib import request as urlrequest
 
+from ah32._internal.json_codec import dumps_bytes
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,8 +23,7 @@ class HttpForwardTelemetrySink:
             return
         if not self.endpoint:
             return
-        payload = {"events": events}
-        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        body = dumps_bytes({"events": events})
         req = urlrequest.Request(
             self.endpoint,
             data=body,
@@ -3,21 +3,66 @@ from __future__ import annotations
 import json
 import logging
 import sqlite3
+import threading
 import time
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+
+from ah32._internal.json_codec import dumps
 
 logger = logging.getLogger(__name__)
 
 
 def _to_json(v: Any) -> str:
     try:
-        return json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+        return dumps(v)
     except Exception:
         return json.dumps({"_error": "json_serialize_failed"}, ensure_ascii=False)
 
 
+# WAL + NORMAL sync keeps batch commits off the fsync path; the WAL file is
+# checkpointed every ~1000 pages and truncated back to 64 MiB so it cannot grow unbounded.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA cache_size=-64000;",
+    "PRAGMA mmap_size=268435456;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA wal_autocheckpoint=1000;",
+    "PRAGMA journal_size_limit=67108864;",
+)
+
+
+_QUERY_CLAUSES = {
+    "since_ts": "ts >= ?",
+    "event_name": "event_name = ?",
+    "run_id": "run_id = ?",
+    "host_app": "host_app = ?",
+    "doc_key": "doc_key = ?",
+    "session_id": "session_id = ?",
+    "block_id": "block_id = ?",
+    "client_id": "client_id = ?",
+}
+
+
+@lru_cache(maxsize=None)
+def _query_sql(names: Tuple[str, ...]) -> str:
+    """SQL for one combination of active filters.
+
+    Identical text lets sqlite3 reuse the prepared statement.
+    """
+    where = ("WHERE " + " AND ".join(_QUERY_CLAUSES[n] for n in names)) if names else ""
+    return f"""
+          SELECT *
+          FROM telemetry_events
+          {where}
+          ORDER BY ts DESC
+          LIMIT ?
+        """
+
+
 @dataclass
 class SQLiteTelemetrySink:
     name: str = "sqlite"
@@ -27,14 +72,16 @@ class SQLiteTelemetrySink:
         self.retention_days = max(1, int(retention_days))
         self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
         self._conn.row_factory = sqlite3.Row
+        self._ro_conn: sqlite3.Connection | None = None
+        # Concurrent first queries must not each open (and leak) a read connection.
+        self._ro_lock = threading.Lock()
         self._init_db()
 
     def _init_db(self) -> None:
         cur = self._conn.cursor()
         try:
-            cur.execute("PRAGMA journal_mode=WAL;")
-            cur.execute("PRAGMA synchronous=NORMAL;")
-            cur.execute("PRAGMA temp_store=MEMORY;")
+            for pragma in _PRAGMAS:
+                cur.execute(pragma)
             cur.execute(
                 """
                 CREATE TABLE IF NOT EXISTS telemetry_events (
@@ -106,6 +153,9 @@ class SQLiteTelemetrySink:
                 )
             if not rows:
                 return
+            # One write transaction per batch; IMMEDIATE takes the write lock up front
+            # instead of upgrading mid-batch.
+            cur.execute("BEGIN IMMEDIATE;")
             cur.executemany(
                 """
                 INSERT INTO telemetry_events(
@@ -136,45 +186,23 @@ class SQLiteTelemetrySink:
         client_id: str | None = None,
     ) -> List[Dict[str, Any]]:
         limit_i = max(1, min(5000, int(limit)))
-        clauses = []
-        params: List[Any] = []
-        if since_ts is not None:
-            clauses.append("ts >= ?")
-            params.append(float(since_ts))
-        if event_name:
-            clauses.append("event_name = ?")
-            params.append(str(event_name))
-        if run_id:
-            clauses.append("run_id = ?")
-            params.append(str(run_id))
-        if host_app:
-            clauses.append("host_app = ?")
-            params.append(str(host_app))
-        if doc_key:
-            clauses.append("doc_key = ?")
-            params.append(str(doc_key))
-        if session_id:
-            clauses.append("session_id = ?")
-            params.append(str(session_id))
-        if block_id:
-            clauses.append("block_id = ?")
-            params.append(str(block_id))
-        if client_id:
-            clauses.append("client_id = ?")
-            params.append(str(client_id))
-
-        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
-        sql = f"""
-          SELECT *
-          FROM telemetry_events
-          {where}
-          ORDER BY ts DESC
-          LIMIT {limit_i}
-        """
-        cur = self._conn.cursor()
+        filters = {
+            "since_ts": float(since_ts) if since_ts is not None else None,
+            "event_name": str(event_name) if event_name else None,
+            "run_id": str(run_id) if run_id else None,
+            "host_app": str(host_app) if host_app else None,
+            "doc_key": str(doc_key) if doc_key else None,
+            "session_id": str(session_id) if session_id else None,
+            "block_id": str(block_id) if block_id else None,
+            "client_id": str(client_id) if client_id else None,
+        }
+        names = tuple(k for k, v in filters.items() if v is not None)
+        params: List[Any] = [filters[k] for k in names]
+        params.append(limit_i)
+        cur = self._read_conn().cursor()
         try:
             out: List[Dict[str, Any]] = []
-            for row in cur.execute(sql, params).fetchall():
+            for row in cur.execute(_query_sql(names), params).fetchall():
                 d = dict(row)
                 try:
                     d["payload"] = json.loads(d.get("payload_json") or "{}")
@@ -186,6 +214,27 @@ class SQLiteTelemetrySink:
         finally:
             cur.close()
 
+    def _read_conn(self) -> sqlite3.Connection:
+        """Read-only connection for query(); under WAL, readers never wait on the writer."""
+        conn = self._ro_conn
+        if conn is not None:
+            return conn
+        with self._ro_lock:
+            if self._ro_conn is None:
+                try:
+                    conn = sqlite3.connect(
+                        self.path.resolve().as_uri() + "?mode=ro", uri=True, check_same_thread=False
+                    )
+                    conn.row_factory = sqlite3.Row
+                except sqlite3.Error:
+                    logger.warning(
+                        "[telemetry/sqlite] read-only connection failed, querying via writer",
+                        exc_info=True,
+                    )
+                    return self._conn
+                self._ro_conn = conn
+            return self._ro_conn
+
     def cleanup(self) -> None:
         """Delete old events by retention window."""
         cutoff = time.time() - float(self.retention_days) * 86400.0
@@ -201,6 +250,10 @@ class SQLiteTelemetrySink:
 
     def close(self) -> None:
         try:
+            with self._ro_lock:
+                if self._ro_conn is not None:
+                    self._ro_conn.close()
+                    self._ro_conn = None
             self._conn.close()
         except Exception:
             logger.error("[telemetry/sqlite] close failed", exc_info=True)
@@ -2871,11 +2871,14 @@ class ReActAgent:
                             return f"错误：工具参数校验失败。tool={tool_name} err={err}"
                         # Run skill tools in a dedicated thread to avoid blocking the asyncio loop.
                         # This is required for integrations like Playwright Sync API.
-                        from ah32.skills.tool_executor import get_skill_tool_thread_pool
+                        from ah32.skills.tool_executor import (
+                            get_skill_tool_thread_pool,
+                            skill_tool_pool_key,
+                        )
 
                         loop = asyncio.get_running_loop()
                         exec_result = await loop.run_in_executor(
-                            get_skill_tool_thread_pool(),
+                            get_skill_tool_thread_pool(skill_tool_pool_key(skill_tool)),
                             self._skill_tool_executor.execute_tool,
                             skill_tool,
                             tool_args,
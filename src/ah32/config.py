@@ -519,7 +519,7 @@ class Ah32Settings(BaseSettings):
 
     telemetry_flush_interval_ms: int = Field(
 
-        default=1000,
+        default=250,
 
         description="Flush interval for batching telemetry writes.",
 
@@ -541,6 +541,17 @@ class Ah32Settings(BaseSettings):
 
     )
 
+    telemetry_max_queue_size: int = Field(
+
+        default=50000,
+
+        description=(
+            "Max in-memory telemetry events awaiting flush; "
+            "newer events are dropped (and counted) when full."
+        ),
+
+    )
+
 
 
     chunk_size: int = Field(default=800)
@@ -14,7 +14,9 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -22,6 +24,19 @@ from ah32.runtime_paths import runtime_root
 
 logger = logging.getLogger(__name__)
 
+_PROMPT_MARKERS = (
+    "skill.json",
+    "SYSTEM.docx",
+    "SYSTEM.md",
+    "prompt.docx",
+    "prompt.md",
+    "SKILL.docx",
+    "SKILL.md",
+    "SYSTEM.txt",
+    "prompt.txt",
+    "SKILL.txt",
+)
+
 
 def seed_builtin_skills(dest_dir: Path) -> int:
     """Copy built-in example skills into dest_dir (non-destructive).
@@ -40,252 +55,338 @@ def seed_builtin_skills(dest_dir: Path) -> int:
     if not src:
         return 0
 
-    prompt_markers = (
-        "skill.json",
-        "SYSTEM.docx",
-        "SYSTEM.md",
-        "prompt.docx",
-        "prompt.md",
-        "SKILL.docx",
-        "SKILL.md",
-        "SYSTEM.txt",
-        "prompt.txt",
-        "SKILL.txt",
-    )
+    children = [
+        child
+        for child in sorted(src.iterdir(), key=lambda p: p.name.lower())
+        if child.is_dir()
+        and any(os.path.exists(os.path.join(child, name)) for name in _PROMPT_MARKERS)
+    ]
+    if not children:
+        return 0
 
-    created = 0
-    for child in sorted(src.iterdir(), key=lambda p: p.name.lower()):
-        if not child.is_dir():
-            continue
-        if not any((child / name).exists() for name in prompt_markers):
-            continue
-        target = dest / child.name
-        if not target.exists():
-            try:
-                shutil.copytree(child, target)
-                created += 1
-            except Exception as e:
-                logger.warning(f"[skills] seed failed: {child} -> {target} err={e}")
-            continue
+    # Each skill folder maps to a distinct target, and the work is file I/O (GIL released),
+    # so folders are processed concurrently.
+    workers = min(8, len(children))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ah32-skill-seed") as ex:
+        return sum(ex.map(lambda child: _seed_one(child, dest), children))
 
-        # Upgrade-in-place (best-effort) when the existing manifest is legacy.
-        # This is common in dev machines where old skills were seeded once and
-        # later the runtime schema was tightened to v1-only.
+
+def _seed_one(child: Path, dest: Path) -> int:
+    """Seed or upgrade one built-in skill folder. Returns 1 if a new folder was created."""
+    target = dest / child.name
+    if not target.exists():
+        return _seed_new(child, target)
+
+    # Upgrade-in-place (best-effort) when the existing manifest is legacy.
+    # This is common in dev machines where old skills were seeded once and
+    # later the runtime schema was tightened to v1-only.
+    try:
+        _upgrade_existing(child, target)
+    except Exception as e:
+        logger.warning(f"[skills] upgrade legacy manifest failed: {child} -> {target} err={e}")
+    return 0
+
+
+def _seed_new(child: Path, target: Path) -> int:
+    """Copy a built-in skill folder that the user does not have yet."""
+    try:
         try:
-            src_manifest = child / "skill.json"
-            dst_manifest = target / "skill.json"
-            if not (src_manifest.exists() and dst_manifest.exists()):
-                continue
+            _fast_copytree(str(child), str(target))
+        except OSError as e:
+            logger.debug(f"[skills] fast seed copy failed, retrying with copytree: {child} err={e}")
+            shutil.copytree(child, target, dirs_exist_ok=True)
+        return 1
+    except Exception as e:
+        logger.warning(f"[skills] seed failed: {child} -> {target} err={e}")
+    return 0
 
-            try:
-                dst_raw = dst_manifest.read_text(encoding="utf-8")
-                dst_data = json.loads(dst_raw) if dst_raw.strip() else {}
-            except Exception:
-                dst_data = {}
-
-            dst_schema = str(dst_data.get("schema_version") or dst_data.get("schemaVersion") or "").strip()
-            if dst_schema == "ah32.skill.v1":
-                # Non-destructive v1 upgrades: merge in new optional fields from built-in manifests
-                # when the user manifest doesn't have them yet.
-                #
-                # Why: we keep runtime strict (v1 only), but we still want built-in skills to gain
-                # new capabilities (e.g., delivery hints) without overwriting user edits.
-                try:
-                    src_raw = src_manifest.read_text(encoding="utf-8")
-                    src_data = json.loads(src_raw) if src_raw.strip() else {}
-                except Exception:
-                    src_data = {}
-
-                changed = False
-                try:
-                    src_delivery = src_data.get("delivery") if isinstance(src_data, dict) else None
-                    dst_delivery = dst_data.get("delivery") if isinstance(dst_data, dict) else None
-                    if isinstance(src_delivery, dict) and src_delivery:
-                        if not isinstance(dst_delivery, dict):
-                            dst_delivery = {}
-                        # delivery.default_writeback
-                        want = (
-                            str(src_delivery.get("default_writeback") or src_delivery.get("defaultWriteback") or "")
-                            .strip()
-                            .lower()
-                        )
-                        have = str(dst_delivery.get("default_writeback") or dst_delivery.get("defaultWriteback") or "").strip()
-                        if want and not have:
-                            dst_delivery["default_writeback"] = want
-                            changed = True
-                        if changed:
-                            dst_data["delivery"] = dst_delivery
-                except Exception as e:
-                    logger.debug(f"[skills] merge v1 manifest extras failed (ignored): {dst_manifest} err={e}", exc_info=True)
-
-                # Merge capabilities (e.g., active_doc_text flags) when the user manifest doesn't have them yet.
-                try:
-                    src_caps = src_data.get("capabilities") if isinstance(src_data, dict) else None
-                    dst_caps = dst_data.get("capabilities") if isinstance(dst_data, dict) else None
-                    if isinstance(src_caps, dict) and src_caps:
-                        if not isinstance(dst_caps, dict):
-                            dst_caps = {}
-                        for key in ("active_doc_text", "active_doc_max_chars"):
-                            want = src_caps.get(key)
-                            if want is None:
-                                continue
-                            if key not in dst_caps:
-                                dst_caps[key] = want
-                                changed = True
-                        if changed:
-                            dst_data["capabilities"] = dst_caps
-                except Exception as e:
-                    logger.debug(f"[skills] merge v1 capabilities failed (ignored): {dst_manifest} err={e}", exc_info=True)
-
-                # Merge tools list (append missing tools only; never overwrite existing tool configs).
-                try:
-                    src_tools = src_data.get("tools") if isinstance(src_data, dict) else None
-                    dst_tools = dst_data.get("tools") if isinstance(dst_data, dict) else None
-                    if isinstance(src_tools, list) and src_tools:
-                        if not isinstance(dst_tools, list):
-                            dst_tools = []
-                        existing_names = set()
-                        dst_by_name: dict[str, dict] = {}
-                        dst_idx_by_name: dict[str, int] = {}
-                        for i, item in enumerate(dst_tools):
-                            if isinstance(item, str):
-                                name = item.strip()
-                                if name:
-                                    existing_names.add(name)
-                                    dst_idx_by_name.setdefault(name, i)
-                            elif isinstance(item, dict):
-                                name = str(item.get("name") or "").strip()
-                                if name:
-                                    existing_names.add(name)
-                                    dst_by_name[name] = item
-                                    dst_idx_by_name.setdefault(name, i)
-                        for item in src_tools:
-                            name = ""
-                            if isinstance(item, str):
-                                name = item.strip()
-                            elif isinstance(item, dict):
-                                name = str(item.get("name") or "").strip()
-                            if not name or name in existing_names:
-                                # Non-destructive merge for existing tool entries (best-effort):
-                                # - Upgrade string tool entry to dict form (adds metadata like hints)
-                                # - Merge missing `hints` keys (do not overwrite user edits)
-                                if isinstance(item, dict) and name:
-                                    dst_item = dst_by_name.get(name)
-                                    # Upgrade "string tool entry" -> dict tool entry when present.
-                                    if dst_item is None:
-                                        try:
-                                            idx = dst_idx_by_name.get(name)
-                                            if idx is not None and isinstance(dst_tools[idx], str):
-                                                dst_tools[idx] = dict(item)
-                                                dst_by_name[name] = dst_tools[idx]
-                                                dst_item = dst_by_name.get(name)
-                                                changed = True
-                                        except Exception:
-                                            logger.debug(
-                                                "[skills] upgrade string tool entry failed (ignored): %s",
-                                                name,
-                                                exc_info=True,
-                                            )
-                                    # Merge tool.hints
-                                    try:
-                                        if isinstance(dst_item, dict):
-                                            src_hints = item.get("hints")
-                                            if isinstance(src_hints, dict) and src_hints:
-                                                dst_hints = dst_item.get("hints")
-                                                if not isinstance(dst_hints, dict):
-                                                    dst_hints = {}
-                                                merged_hints = dict(dst_hints)
-                                                for k, v in src_hints.items():
-                                                    if k in merged_hints:
-                                                        # Merge list-like triggers without overwriting.
-                                                        if k in ("triggers", "trigger") and isinstance(merged_hints.get(k), list) and isinstance(v, list):
-                                                            cur = list(merged_hints.get(k) or [])
-                                                            for x in v:
-                                                                if x not in cur:
-                                                                    cur.append(x)
-                                                            merged_hints[k] = cur
-                                                        continue
-                                                    merged_hints[k] = v
-                                                if merged_hints != dst_hints:
-                                                    dst_item["hints"] = merged_hints
-                                                    changed = True
-                                    except Exception:
-                                        logger.debug(
-                                            "[skills] merge tool hints failed (ignored): %s",
-                                            name,
-                                            exc_info=True,
-                                        )
-                                continue
-                            dst_tools.append(item)
-                            existing_names.add(name)
-                            changed = True
-                        dst_data["tools"] = dst_tools
-                except Exception as e:
-                    logger.debug(f"[skills] merge v1 tools failed (ignored): {dst_manifest} err={e}", exc_info=True)
-
-                if changed:
-                    ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-                    backup = target / f"skill.json.upgrade.{ts}.bak"
-                    try:
-                        if not backup.exists():
-                            backup.write_text(dst_raw if isinstance(dst_raw, str) else "", encoding="utf-8")
-                    except Exception as e:
-                        logger.warning(f"[skills] backup v1 upgrade manifest failed: {dst_manifest} -> {backup} err={e}")
-                    try:
-                        dst_manifest.write_text(
-                            json.dumps(dst_data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
-                        )
-                        logger.info(f"[skills] upgraded v1 manifest (non-destructive): {dst_manifest} (backup={backup.name})")
-                    except Exception as e:
-                        logger.warning(f"[skills] write upgraded v1 manifest failed: {dst_manifest} err={e}")
-
-                # Always copy missing files from built-in skill folder (e.g., new scripts/* tools),
-                # without overwriting user edits.
-                try:
-                    _copy_missing_files(child, target)
-                except Exception as e:
-                    logger.debug(f"[skills] sync missing v1 skill files failed (ignored): {child} -> {target} err={e}", exc_info=True)
-                continue
-
-            # Keep a timestamped backup next to the file for human recovery.
-            ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-            backup = target / f"skill.json.legacy.{ts}.bak"
-            try:
-                if not backup.exists():
-                    backup.write_text(dst_raw if isinstance(dst_raw, str) else "", encoding="utf-8")
-            except Exception as e:
-                logger.warning(f"[skills] backup legacy manifest failed: {dst_manifest} -> {backup} err={e}")
 
-            # Overwrite only the manifest with the built-in v1 version. Keep prompts as-is.
-            shutil.copy2(src_manifest, dst_manifest)
-            logger.info(f"[skills] upgraded legacy manifest to v1: {dst_manifest} (backup={backup.name})")
-        except Exception as e:
-            logger.warning(f"[skills] upgrade legacy manifest failed: {child} -> {target} err={e}")
-    return created
+def _read_manifest(path: Path) -> tuple[bytes, dict]:
+    """Return (raw bytes, parsed manifest); unreadable/invalid manifests parse as {}."""
+    raw = b""
+    try:
+        raw = path.read_bytes()
+        text = raw.decode("utf-8")
+        return raw, (json.loads(text) if text.strip() else {})
+    except Exception:
+        return raw, {}
 
 
-def _copy_missing_files(src_dir: Path, dst_dir: Path) -> None:
-    """Copy missing files from src_dir to dst_dir (non-destructive)."""
-    src_dir = Path(src_dir)
-    dst_dir = Path(dst_dir)
-    if not src_dir.exists() or not src_dir.is_dir():
+def _upgrade_existing(child: Path, target: Path) -> None:
+    """Bring an existing user copy of a built-in skill up to date (see module policy)."""
+    src_manifest = child / "skill.json"
+    dst_manifest = target / "skill.json"
+    if not (src_manifest.exists() and dst_manifest.exists()):
         return
-    if not dst_dir.exists() or not dst_dir.is_dir():
+
+    dst_raw, dst_data = _read_manifest(dst_manifest)
+    dst_schema = str(dst_data.get("schema_version") or dst_data.get("schemaVersion") or "").strip()
+    if dst_schema == "ah32.skill.v1":
+        _upgrade_v1(child, target, dst_raw, dst_data)
         return
 
-    for path in src_dir.rglob("*"):
-        target: Path | None = None
+    # Overwrite only the manifest with the built-in v1 version. Keep prompts as-is.
+    backup_name = _write_manifest_with_backup(
+        dst_manifest, dst_raw, src_manifest.read_bytes(), "legacy"
+    )
+    logger.info(f"[skills] upgraded legacy manifest to v1: {dst_manifest} (backup={backup_name})")
+
+
+def _upgrade_v1(child: Path, target: Path, dst_raw: bytes, dst_data: dict) -> None:
+    """Non-destructive v1 upgrade: merge new optional fields, then copy missing files.
+
+    Why: we keep runtime strict (v1 only), but we still want built-in skills to gain
+    new capabilities (e.g., delivery hints) without overwriting user edits.
+    """
+    dst_manifest = target / "skill.json"
+    _src_raw, src_data = _read_manifest(child / "skill.json")
+    # Most built-in manifests only declare a subset of the mergeable sections;
+    # one set lookup per section skips the merge helpers entirely otherwise.
+    src_keys = set(src_data) if isinstance(src_data, dict) else set()
+
+    changed = False
+    for section, merge in _V1_MERGES:
+        if section not in src_keys:
+            continue
         try:
-            if not path.is_file():
-                continue
-            rel = path.relative_to(src_dir)
-            target = dst_dir / rel
-            if target.exists():
-                continue
-            target.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(path, target)
+            changed = merge(src_data.get(section), dst_data) or changed
         except Exception as e:
             logger.debug(
-                f"[skills] copy missing file failed (ignored): {path} -> {target} err={e}",
+                f"[skills] merge v1 {section} failed (ignored): {dst_manifest} err={e}",
                 exc_info=True,
             )
+
+    if changed:
+        try:
+            payload = (json.dumps(dst_data, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+            backup_name = _write_manifest_with_backup(dst_manifest, dst_raw, payload, "upgrade")
+            logger.info(
+                f"[skills] upgraded v1 manifest (non-destructive): {dst_manifest} "
+                f"(backup={backup_name})"
+            )
+        except Exception as e:
+            logger.warning(f"[skills] write upgraded v1 manifest failed: {dst_manifest} err={e}")
+
+    # Always copy missing files from built-in skill folder (e.g., new scripts/* tools),
+    # without overwriting user edits.
+    try:
+        _copy_missing_files(child, target)
+    except Exception as e:
+        logger.debug(
+            f"[skills] sync missing v1 skill files failed (ignored): {child} -> {target} err={e}",
+            exc_info=True,
+        )
+
+
+def _merge_delivery(src_delivery: object, dst_data: dict) -> bool:
+    """Fill delivery.default_writeback from the built-in manifest when the user has none."""
+    if not (isinstance(src_delivery, dict) and src_delivery):
+        return False
+    dst_delivery = dst_data.get("delivery")
+    if not isinstance(dst_delivery, dict):
+        dst_delivery = {}
+    want = _first_nonempty(src_delivery, "default_writeback", "defaultWriteback").lower()
+    have = _first_nonempty(dst_delivery, "default_writeback", "defaultWriteback")
+    if not want or have:
+        return False
+    dst_delivery["default_writeback"] = want
+    dst_data["delivery"] = dst_delivery
+    return True
+
+
+def _merge_capabilities(src_caps: object, dst_data: dict) -> bool:
+    """Add capability flags (e.g., active_doc_text) the user manifest doesn't have yet."""
+    if not (isinstance(src_caps, dict) and src_caps):
+        return False
+    dst_caps = dst_data.get("capabilities")
+    if not isinstance(dst_caps, dict):
+        dst_caps = {}
+    changed = False
+    for key in ("active_doc_text", "active_doc_max_chars"):
+        want = src_caps.get(key)
+        if want is not None and key not in dst_caps:
+            dst_caps[key] = want
+            changed = True
+    if changed:
+        dst_data["capabilities"] = dst_caps
+    return changed
+
+
+def _tool_name(item: object) -> str:
+    if isinstance(item, str):
+        return item.strip()
+    if isinstance(item, dict):
+        return str(item.get("name") or "").strip()
+    return ""
+
+
+def _merge_tools(src_tools: object, dst_data: dict) -> bool:
+    """Append missing tools; never overwrite existing tool configs (see _merge_existing_tool)."""
+    if not (isinstance(src_tools, list) and src_tools):
+        return False
+    dst_tools = dst_data.get("tools")
+    if not isinstance(dst_tools, list):
+        dst_tools = []
+    dst_by_name: dict[str, dict] = {}  # last dict-form entry per name
+    dst_idx_by_name: dict[str, int] = {}  # first entry (string or dict form) per name
+    for i, item in enumerate(dst_tools):
+        name = _tool_name(item)
+        if name:
+            dst_idx_by_name.setdefault(name, i)
+            if isinstance(item, dict):
+                dst_by_name[name] = item
+    existing_names = set(dst_idx_by_name)
+    changed = False
+    for item in src_tools:
+        name = _tool_name(item)
+        if not name or name in existing_names:
+            if isinstance(item, dict) and name:
+                merged = _merge_existing_tool(item, name, dst_tools, dst_by_name, dst_idx_by_name)
+                changed = merged or changed
+            continue
+        dst_tools.append(item)
+        existing_names.add(name)
+        changed = True
+    dst_data["tools"] = dst_tools
+    return changed
+
+
+def _merge_existing_tool(
+    item: dict, name: str, dst_tools: list, dst_by_name: dict, dst_idx_by_name: dict
+) -> bool:
+    """Non-destructive merge for a tool the user already has (best-effort).
+
+    - Upgrade string tool entry to dict form (adds metadata like hints)
+    - Merge missing `hints` keys (do not overwrite user edits)
+    """
+    changed = False
+    dst_item = dst_by_name.get(name)
+    if dst_item is None:
+        idx = dst_idx_by_name.get(name)
+        if idx is not None and isinstance(dst_tools[idx], str):
+            dst_item = dst_by_name[name] = dst_tools[idx] = dict(item)
+            changed = True
+    src_hints = item.get("hints")
+    if not (isinstance(dst_item, dict) and isinstance(src_hints, dict) and src_hints):
+        return changed
+    try:
+        dst_hints = dst_item.get("hints")
+        if not isinstance(dst_hints, dict):
+            dst_hints = {}
+        merged_hints = _merge_hints(dst_hints, src_hints)
+        if merged_hints != dst_hints:
+            dst_item["hints"] = merged_hints
+            changed = True
+    except Exception:
+        logger.debug("[skills] merge tool hints failed (ignored): %s", name, exc_info=True)
+    return changed
+
+
+def _merge_hints(dst_hints: dict, src_hints: dict) -> dict:
+    """Add missing hint keys; list-like triggers are unioned, other user values are kept."""
+    merged = dict(dst_hints)
+    for k, v in src_hints.items():
+        if k not in merged:
+            merged[k] = v
+        elif k in ("triggers", "trigger") and isinstance(merged[k], list) and isinstance(v, list):
+            cur = list(merged[k])
+            for x in v:
+                if x not in cur:
+                    cur.append(x)
+            merged[k] = cur
+    return merged
+
+
+_V1_MERGES = (
+    ("delivery", _merge_delivery),
+    ("capabilities", _merge_capabilities),
+    ("tools", _merge_tools),
+)
+
+
+def _first_nonempty(d: dict, *keys: str) -> str:
+    """str() of the first truthy value among keys, stripped; same as `str(a or b or "").strip()`."""
+    for key in keys:
+        v = d.get(key)
+        if v:
+            return str(v).strip()
+    return ""
+
+
+def _fast_copytree(src: str, dst: str) -> None:
+    """Recursively copy src into a fresh dst (first-run seeding only).
+
+    Unlike shutil.copytree this skips copystat/Path allocation per entry; file
+    metadata is not preserved.
+    """
+    os.makedirs(dst, exist_ok=True)
+    with os.scandir(src) as it:
+        for entry in it:
+            target = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                _fast_copytree(entry.path, target)
+            else:
+                shutil.copyfile(entry.path, target)
+
+
+def _write_manifest_with_backup(
+    dst_manifest: Path, old_bytes: bytes, new_bytes: bytes, label: str
+) -> str:
+    """Back up the current manifest, then atomically replace it with new_bytes.
+
+    The backup (`skill.json.<label>.<ts>.bak`) sits next to the file for human recovery;
+    a failed backup is logged but does not block the upgrade. Returns the backup file name.
+    """
+    ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    backup = dst_manifest.with_name(f"{dst_manifest.name}.{label}.{ts}.bak")
+    try:
+        if not backup.exists():
+            backup.write_bytes(old_bytes)
+    except Exception as e:
+        logger.warning(
+            f"[skills] backup {label} manifest failed: {dst_manifest} -> {backup} err={e}"
+        )
+    _atomic_write_bytes(dst_manifest, new_bytes)
+    return backup.name
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write data to path via a sibling temp file + os.replace (never leaves a truncated file)."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except Exception:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _copy_missing_files(src_dir: Path, dst_dir: Path) -> None:
+    """Copy missing files from src_dir to dst_dir (non-destructive)."""
+    src_root = os.fspath(src_dir)
+    dst_root = os.fspath(dst_dir)
+    if not os.path.isdir(src_root) or not os.path.isdir(dst_root):
+        return
+
+    # Runs for every file of every built-in skill on startup: use plain string paths
+    # (no Path allocation per join) and remember parent dirs already ensured so files
+    # sharing a (possibly deep) scripts/ folder don't repeat the mkdir call.
+    created_dirs: set[str] = set()
+    for root, _dirs, files in os.walk(src_root):
+        rel = os.path.relpath(root, src_root)
+        parent = dst_root if rel == os.curdir else os.path.join(dst_root, rel)
+        for name in files:
+            path = os.path.join(root, name)
+            target = os.path.join(parent, name)
+            try:
+                if os.path.exists(target):
+                    continue
+                if parent not in created_dirs:
+                    os.makedirs(parent, exist_ok=True)
+                    created_dirs.add(parent)
+                shutil.copy2(path, target)
+            except Exception as e:
+                logger.debug(
+                    f"[skills] copy missing file failed (ignored): {path} -> {target} err={e}",
+                    exc_info=True,
+                )
@@ -3,58 +3,151 @@
 from __future__ import annotations
 
 import atexit
-import importlib.util
 import json
 import logging
+import os
+import re
 import sys
 import threading
+import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+from importlib.util import module_from_spec, spec_from_file_location
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from ah32._internal.json_codec import dumps as _dumps
 
 from .registry import SkillTool
 
 logger = logging.getLogger(__name__)
 
-_SKILL_TOOL_THREAD_POOL: Optional[ThreadPoolExecutor] = None
-_SKILL_TOOL_THREAD_POOL_LOCK = threading.Lock()
+# JSON-schema "type" -> (accepted Python types, article + name used in error messages).
+_JSON_TYPE_MAP: Dict[str, Tuple[Any, str]] = {
+    "string": (str, "a string"),
+    "integer": (int, "an integer"),
+    "number": ((int, float), "a number"),
+    "boolean": (bool, "a boolean"),
+    "array": (list, "an array"),
+    "object": (dict, "an object"),
+}
+# ToolExecutor._schema_cache value: (tool, required argument names, per-argument type checks).
+_SchemaEntry = Tuple[SkillTool, Tuple[Any, ...], Dict[str, Tuple[Any, str]]]
+
+# Tool-call objects in LLM responses (see ToolExecutor.parse_tool_calls_from_response):
+# the object after an explicit `TOOL_CALL:` marker (any key order), and bare JSON blocks,
+# which are only tried when they open with a name/arguments key.
+_TOOL_CALL_MARKER_RE = re.compile(r"TOOL_CALL:\s*\{")
+_TOOL_CALL_START_RE = re.compile(r'\{\s*"(?:name|arguments)"\s*:')
+_JSON_DECODER = json.JSONDecoder()
+
+_SKILL_TOOL_POOLS: Dict[str, ThreadPoolExecutor] = {}
+_SKILL_TOOL_POOLS_LOCK = threading.Lock()
+_BUILTIN_TOOLS_DIR = Path(__file__).resolve().parent / "tools"
+# Pools a manifest may request via `hints.thread_pool`: names are checked and their number
+# capped, so third-party skills cannot create an unbounded set of executors.
+_POOL_NAME_RE = re.compile(r"[A-Za-z0-9_-]{1,32}")
+_MAX_MANIFEST_POOLS = 8
+_MANIFEST_POOLS: set[str] = set()
+
+
+@lru_cache(maxsize=4096)
+def _module_name_for(path: str, name: str) -> str:
+    """Unique sys.modules name per tool script (avoids collisions across skills/tools)."""
+    return f"ah32_skilltool_{name}_{abs(hash(path)) % 1_000_000_000}"
+
+
+def _iter_tool_call_objects(text: str, start_re: re.Pattern[str]) -> Iterator[Tuple[int, int, Any]]:
+    """Yield (start, end, value) for the JSON object at the last `{` of each start_re match.
+
+    Each candidate brace is decoded with a C-level raw_decode: no regex backtracking
+    and nested argument objects are handled. Only braces that look like a tool call
+    are tried, so stray braces in prose don't each pay for a failed decode.
+    """
+    for m in start_re.finditer(text):
+        start = text.rindex("{", m.start(), m.end())
+        try:
+            value, end = _JSON_DECODER.raw_decode(text, start)
+        except (ValueError, RecursionError):
+            continue
+        yield start, end, value
 
 
-def get_skill_tool_thread_pool() -> ThreadPoolExecutor:
-    """Return a shared single-thread pool for running skill tools.
+def get_skill_tool_thread_pool(key: str = "default") -> ThreadPoolExecutor:
+    """Return the shared single-thread pool for running skill tools of `key`.
 
     Why: some integrations (e.g., Playwright sync API) cannot run inside the
-    server's asyncio event loop thread.
+    server's asyncio event loop thread, and need a stable thread of their own.
+    Pools are keyed (see `skill_tool_pool_key`) so a slow tool on one pool
+    cannot starve tools routed to another.
     """
-    global _SKILL_TOOL_THREAD_POOL
-    if _SKILL_TOOL_THREAD_POOL is None:
-        with _SKILL_TOOL_THREAD_POOL_LOCK:
-            if _SKILL_TOOL_THREAD_POOL is None:
-                _SKILL_TOOL_THREAD_POOL = ThreadPoolExecutor(
+    pool = _SKILL_TOOL_POOLS.get(key)
+    if pool is None:
+        with _SKILL_TOOL_POOLS_LOCK:
+            pool = _SKILL_TOOL_POOLS.get(key)
+            if pool is None:
+                pool = ThreadPoolExecutor(
                     max_workers=1,
-                    thread_name_prefix="ah32-skill-tools",
+                    thread_name_prefix=f"ah32-skill-tools-{key}",
                 )
-    return _SKILL_TOOL_THREAD_POOL
+                _SKILL_TOOL_POOLS[key] = pool
+    return pool
 
 
-def _shutdown_skill_tool_thread_pool() -> None:
-    global _SKILL_TOOL_THREAD_POOL
-    pool = _SKILL_TOOL_THREAD_POOL
-    if pool is None:
-        return
+def skill_tool_pool_key(tool: SkillTool) -> str:
+    """Pick the thread pool for a tool.
+
+    Built-in tools (ah32/skills/tools) are pure Python and get their own pool.
+    User scripts share "default" (keeps Playwright thread affinity) unless the
+    manifest opts out via `hints.thread_pool`.
+    """
+    hint = tool.hints.get("thread_pool") if isinstance(tool.hints, dict) else None
+    return _pool_key_for(str(tool.script_path), hint.strip() if isinstance(hint, str) else "")
+
+
+@lru_cache(maxsize=1024)
+def _pool_key_for(script_path: str, hint: str) -> str:
+    """skill_tool_pool_key, computed once per (script, hint): resolve() is a filesystem call."""
     try:
-        pool.shutdown(wait=False, cancel_futures=True)
-    except Exception:
-        logger.debug("[tools] skill tool thread pool shutdown failed", exc_info=True)
-    finally:
-        _SKILL_TOOL_THREAD_POOL = None
+        if Path(script_path).resolve().parent == _BUILTIN_TOOLS_DIR:
+            return "builtin"
+    except OSError:
+        logger.debug("[tools] resolve tool script path failed: %s", script_path, exc_info=True)
+    if not hint:
+        return "default"
+    if not _POOL_NAME_RE.fullmatch(hint):
+        logger.warning(
+            "[tools] invalid hints.thread_pool %r for %s, using default", hint, script_path
+        )
+        return "default"
+    with _SKILL_TOOL_POOLS_LOCK:
+        if hint not in _MANIFEST_POOLS and len(_MANIFEST_POOLS) >= _MAX_MANIFEST_POOLS:
+            logger.warning(
+                "[tools] thread pool limit (%d) reached, %s uses default instead of %r",
+                _MAX_MANIFEST_POOLS, script_path, hint,
+            )
+            return "default"
+        _MANIFEST_POOLS.add(hint)
+    return hint
+
+
+def _shutdown_skill_tool_thread_pool() -> None:
+    with _SKILL_TOOL_POOLS_LOCK:
+        pools = list(_SKILL_TOOL_POOLS.values())
+        _SKILL_TOOL_POOLS.clear()
+    for pool in pools:
+        try:
+            pool.shutdown(wait=False, cancel_futures=True)
+        except Exception:
+            logger.debug("[tools] skill tool thread pool shutdown failed", exc_info=True)
 
 
 atexit.register(_shutdown_skill_tool_thread_pool)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ToolResult:
     """Result of a tool execution."""
     success: bool
@@ -75,10 +168,19 @@ class ToolExecutor:
         )
     """
 
-    def __init__(self, max_tool_calls_per_turn: int = 3) -> None:
+    def __init__(self, max_tool_calls_per_turn: int = 3, max_cached_tools: int = 256) -> None:
         self.max_tool_calls_per_turn = max_tool_calls_per_turn
-        self._tool_cache: Dict[str, Callable] = {}
+        # LRU of loaded tools: cache_key -> (script mtime_ns, module_name, func). Bounded so
+        # long-running servers loading many ephemeral skills don't keep every tool module alive;
+        # the mtime lets edited scripts hot-reload.
+        self._tool_cache: "OrderedDict[str, Tuple[Optional[int], str, Callable]]" = OrderedDict()
+        self._cache_max = max(1, int(max_cached_tools))
+        # Guards cache writes/eviction and the per-tool load-lock table; never held while a
+        # tool module is being imported.
         self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        # id(tool) -> (tool, required, type checks); see _tool_schema().
+        self._schema_cache: Dict[int, _SchemaEntry] = {}
 
     def execute_tool(
         self,
@@ -96,8 +198,10 @@ class ToolExecutor:
         Returns:
             ToolResult with success status and result or error.
         """
-        import time
-        start_ms = int(time.time() * 1000)
+        start_ns = time.monotonic_ns()
+
+        def _elapsed_ms() -> int:
+            return (time.monotonic_ns() - start_ns) // 1_000_000
 
         # Get or load the tool function
         func = self._get_tool_func(tool)
@@ -105,7 +209,7 @@ class ToolExecutor:
             return ToolResult(
                 success=False,
                 error=f"Tool function not found: {tool.name}",
-                execution_ms=int(time.time() * 1000) - start_ms,
+                execution_ms=_elapsed_ms(),
             )
 
         # Execute the tool
@@ -117,66 +221,125 @@ class ToolExecutor:
             return ToolResult(
                 success=True,
                 result=result,
-                execution_ms=int(time.time() * 1000) - start_ms,
+                execution_ms=_elapsed_ms(),
             )
         except Exception as e:
             logger.warning(f"[tools] tool {tool.name} failed: {e}", exc_info=True)
             return ToolResult(
                 success=False,
                 error=str(e),
-                execution_ms=int(time.time() * 1000) - start_ms,
+                execution_ms=_elapsed_ms(),
             )
 
     def _get_tool_func(self, tool: SkillTool) -> Optional[Callable]:
         """Load and cache a tool function from its script."""
-        cache_key = f"{tool.script_path}:{tool.name}"
+        cache_key = self._cache_key(tool)
+        mtime_ns = self._script_mtime_ns(tool)
+
+        # Hit path is lock-free: single OrderedDict get/move_to_end calls are atomic in CPython.
+        cached = self._tool_cache.get(cache_key)
+        if cached is not None and (mtime_ns is None or cached[0] == mtime_ns):
+            self._touch(cache_key)
+            return cached[2]
 
+        # Miss: serialize loads per tool only, so loading one script never blocks other tools.
         with self._lock:
-            if cache_key in self._tool_cache:
-                return self._tool_cache[cache_key]
+            load_lock = self._load_locks.setdefault(cache_key, threading.Lock())
+        with load_lock:
+            cached = self._tool_cache.get(cache_key)
+            if cached is not None and (mtime_ns is None or cached[0] == mtime_ns):
+                return cached[2]
+
+            module_name = _module_name_for(str(tool.script_path), tool.name)
+            func = self._load_tool_func(tool, module_name)
+            if func is None:
+                return None
+
+            with self._lock:
+                self._tool_cache[cache_key] = (mtime_ns, module_name, func)
+                self._tool_cache.move_to_end(cache_key)
+                while len(self._tool_cache) > self._cache_max:
+                    evicted_key, (_, evicted_module, _) = self._tool_cache.popitem(last=False)
+                    self._load_locks.pop(evicted_key, None)
+                    sys.modules.pop(evicted_module, None)
+            logger.debug(f"[tools] loaded tool: {tool.name} from {tool.script_path}")
+            return func
+
+    @staticmethod
+    def _script_mtime_ns(tool: SkillTool) -> Optional[int]:
+        # One stat per call; None (unreadable script) keeps whatever is cached.
+        try:
+            return os.stat(tool.script_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _touch(self, cache_key: str) -> None:
+        try:
+            self._tool_cache.move_to_end(cache_key)
+        except KeyError:
+            # Evicted/invalidated concurrently; the caller still holds a usable func.
+            pass
+
+    @staticmethod
+    def _load_tool_func(tool: SkillTool, module_name: str) -> Optional[Callable]:
+        """Import a tool script as `module_name` and return its tool function."""
+        try:
+            # Use a unique module name per script to avoid collisions across skills/tools,
+            # and register it in sys.modules before exec_module so that decorators like
+            # @dataclass can resolve module globals correctly.
+            spec = spec_from_file_location(module_name, tool.script_path)
+            if spec is None or spec.loader is None:
+                logger.warning(f"[tools] cannot load spec for {tool.script_path}")
+                return None
 
+            module = module_from_spec(spec)
             try:
-                # Use a unique module name per script to avoid collisions across skills/tools,
-                # and register it in sys.modules before exec_module so that decorators like
-                # @dataclass can resolve module globals correctly.
-                module_name = f"ah32_skilltool_{tool.name}_{abs(hash(str(tool.script_path))) % 1_000_000_000}"
-                spec = importlib.util.spec_from_file_location(module_name, tool.script_path)
-                if spec is None or spec.loader is None:
-                    logger.warning(f"[tools] cannot load spec for {tool.script_path}")
-                    return None
-
-                module = importlib.util.module_from_spec(spec)
-                try:
-                    sys.modules[module_name] = module
-                except Exception:
-                    # Best-effort; exec_module will still run.
-                    logger.warning(
-                        "[tools] failed to register tool module in sys.modules: %s",
-                        module_name,
-                        exc_info=True,
-                    )
-                spec.loader.exec_module(module)
-
-                # Look for function with same name as tool
-                func = getattr(module, tool.name, None)
-                if func is None:
-                    # Try lowercase
-                    func = getattr(module, tool.name.lower(), None)
-
-                if func is None or not callable(func):
-                    logger.warning(f"[tools] no callable function '{tool.name}' in {tool.script_path}")
-                    return None
-
-                self._tool_cache[cache_key] = func
-                logger.debug(f"[tools] loaded tool: {tool.name} from {tool.script_path}")
-                return func
-
-            except Exception as e:
+                sys.modules[module_name] = module
+            except Exception:
+                # Best-effort; exec_module will still run.
                 logger.warning(
-                    f"[tools] failed to load tool from {tool.script_path}: {e}",
+                    "[tools] failed to register tool module in sys.modules: %s",
+                    module_name,
                     exc_info=True,
                 )
+            spec.loader.exec_module(module)
+
+            # Look for function with same name as tool
+            func = getattr(module, tool.name, None)
+            if func is None:
+                # Try lowercase
+                func = getattr(module, tool.name.lower(), None)
+
+            if func is None or not callable(func):
+                logger.warning(f"[tools] no callable function '{tool.name}' in {tool.script_path}")
                 return None
+            return func
+
+        except Exception as e:
+            logger.warning(
+                f"[tools] failed to load tool from {tool.script_path}: {e}",
+                exc_info=True,
+            )
+            return None
+
+    def invalidate(self, tool: SkillTool) -> bool:
+        """Drop a cached tool (and its module) so the next call reloads the script.
+
+        Returns:
+            True if the tool was cached.
+        """
+        cache_key = self._cache_key(tool)
+        with self._lock:
+            cached = self._tool_cache.pop(cache_key, None)
+            self._load_locks.pop(cache_key, None)
+        if cached is None:
+            return False
+        sys.modules.pop(cached[1], None)
+        return True
+
+    @staticmethod
+    def _cache_key(tool: SkillTool) -> str:
+        return f"{tool.script_path}:{tool.name}"
 
     def render_tool_result_for_llm(self, tool: SkillTool, result: ToolResult) -> str:
         """Render a tool result as a string for LLM consumption.
@@ -194,15 +357,16 @@ class ToolExecutor:
                     "message": str(result.error or "tool execution failed"),
                 }
             }
-            return json.dumps(payload, ensure_ascii=False)
+            return _dumps(payload)
 
-        payload = {"result": {"data": result.result if isinstance(result.result, dict) else {"value": result.result}}}
-        return json.dumps(payload, ensure_ascii=False)
+        # execute_tool already wraps non-dict returns as {"result": ...}.
+        payload = {"result": {"data": result.result}}
+        return _dumps(payload)
 
     def parse_tool_calls_from_response(self, response_text: str) -> list[Dict[str, Any]]:
         """Parse tool calls from LLM response text.
 
-        Looks for patterns like:
+        Looks for JSON objects with `name` and `arguments` keys, e.g.:
         ```
         TOOL_CALL: {"name": "tool_name", "arguments": {...}}
         ```
@@ -210,6 +374,7 @@ class ToolExecutor:
         ```json
         {"name": "tool_name", "arguments": {...}}
         ```
+        Nested argument objects are supported.
 
         Args:
             response_text: The LLM response text.
@@ -217,31 +382,27 @@ class ToolExecutor:
         Returns:
             List of tool call dicts with 'name' and 'arguments'.
         """
-        import re
-
         tool_calls: list[Dict[str, Any]] = []
-
-        # Pattern 1: TOOL_CALL: {...}
-        pattern1 = re.compile(r'TOOL_CALL:\s*(\{[^}]+\})', re.DOTALL)
-        for match in pattern1.finditer(response_text):
-            try:
-                call = json.loads(match.group(1))
-                if "name" in call and "arguments" in call:
-                    tool_calls.append(call)
-            except json.JSONDecodeError:
-                continue
-
-        # Pattern 2: JSON block with name and arguments
-        pattern2 = re.compile(r'\{\s*"name"\s*:\s*"[^"]+"\s*,\s*"arguments"\s*:\s*\{[^}]+\}\s*\}', re.DOTALL)
-        for match in pattern2.finditer(response_text):
-            try:
-                call = json.loads(match.group(0))
-                if "name" in call and "arguments" in call:
-                    # Avoid duplicates
-                    if call not in tool_calls:
-                        tool_calls.append(call)
-            except json.JSONDecodeError:
+        # Spans of accepted calls: objects inside one (its arguments, or the same object
+        # seen again as a bare block) are not calls of their own.
+        spans: list[tuple[int, int]] = []
+
+        # Pattern 1: TOOL_CALL: {...} (every marked call is kept, duplicates included)
+        for start, end, call in _iter_tool_call_objects(response_text, _TOOL_CALL_MARKER_RE):
+            if isinstance(call, dict) and "name" in call and "arguments" in call:
+                tool_calls.append(call)
+                spans.append((start, end))
+
+        # Pattern 2: bare JSON blocks with name and arguments
+        call_end = -1
+        for start, end, call in _iter_tool_call_objects(response_text, _TOOL_CALL_START_RE):
+            if start < call_end or any(s <= start < e for s, e in spans):
                 continue
+            if isinstance(call, dict) and "name" in call and "arguments" in call:
+                call_end = end
+                # Avoid duplicates (whole-call comparison)
+                if call not in tool_calls:
+                    tool_calls.append(call)
 
         return tool_calls
 
@@ -264,8 +425,7 @@ class ToolExecutor:
             # No schema defined, accept any arguments
             return True, None
 
-        required = params.get("required", [])
-        properties = params.get("properties", {})
+        required, type_checks = self._tool_schema(tool)
 
         # Check required parameters
         for req in required:
@@ -274,19 +434,32 @@ class ToolExecutor:
 
         # Type checking (basic)
         for key, value in arguments.items():
-            if key in properties:
-                expected_type = properties[key].get("type")
-                if expected_type == "string" and not isinstance(value, str):
-                    return False, f"Argument '{key}' must be a string"
-                elif expected_type == "integer" and not isinstance(value, int):
-                    return False, f"Argument '{key}' must be an integer"
-                elif expected_type == "number" and not isinstance(value, (int, float)):
-                    return False, f"Argument '{key}' must be a number"
-                elif expected_type == "boolean" and not isinstance(value, bool):
-                    return False, f"Argument '{key}' must be a boolean"
-                elif expected_type == "array" and not isinstance(value, list):
-                    return False, f"Argument '{key}' must be an array"
-                elif expected_type == "object" and not isinstance(value, dict):
-                    return False, f"Argument '{key}' must be an object"
+            check = type_checks.get(key)
+            if check is not None and not isinstance(value, check[0]):
+                return False, f"Argument '{key}' must be {check[1]}"
 
         return True, None
+
+    def _tool_schema(self, tool: SkillTool) -> Tuple[Tuple[Any, ...], Dict[str, Tuple[Any, str]]]:
+        """Return (required, per-argument type checks) derived once per SkillTool.
+
+        SkillTool is frozen but unhashable (dict fields), so entries are keyed by id() and
+        keep a reference to the tool to guard against id reuse.
+        """
+        cached = self._schema_cache.get(id(tool))
+        if cached is not None and cached[0] is tool:
+            return cached[1], cached[2]
+
+        params = tool.parameters
+        required = tuple(params.get("required", []))
+        type_checks: Dict[str, Tuple[Any, str]] = {}
+        for key, prop in params.get("properties", {}).items():
+            expected_type = prop.get("type")
+            check = _JSON_TYPE_MAP.get(expected_type) if isinstance(expected_type, str) else None
+            if check is not None:
+                type_checks[key] = check
+
+        if len(self._schema_cache) >= self._cache_max:
+            self._schema_cache.clear()
+        self._schema_cache[id(tool)] = (tool, required, type_checks)
+        return required, type_checks
@@ -1,19 +1,30 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, Dict
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 
 
-def date_calculator(start_date: str, end_date: str, inclusive: bool = False) -> Dict[str, Any]:
-    start = datetime.strptime(start_date, "%Y-%m-%d").date()
-    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+@lru_cache(maxsize=1024)
+def _parse(d: str) -> date:
+    return datetime.strptime(d, "%Y-%m-%d").date()
+
+
+@lru_cache(maxsize=1024)
+def _date_span(start_date: str, end_date: str, inclusive: bool) -> Tuple[Tuple[str, Any], ...]:
+    start = _parse(start_date)
+    end = _parse(end_date)
     days = (end - start).days
     if inclusive:
         days += 1
-    return {
-        "start_date": start.isoformat(),
-        "end_date": end.isoformat(),
-        "days": days,
-        "inclusive": bool(inclusive),
-    }
+    return (
+        ("start_date", start.isoformat()),
+        ("end_date", end.isoformat()),
+        ("days", days),
+        ("inclusive", inclusive),
+    )
 
+
+def date_calculator(start_date: str, end_date: str, inclusive: bool = False) -> Dict[str, Any]:
+    # The result is pure in its inputs; cache it as immutable pairs and hand out a fresh dict.
+    return dict(_date_span(start_date, end_date, bool(inclusive)))
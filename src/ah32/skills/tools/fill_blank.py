@@ -1,16 +1,26 @@
 from __future__ import annotations
 
-import re
 from typing import Any, Dict, List
 
+try:
+    # RE2 runs the alternation as one linear-time automaton pass over long documents.
+    import re2 as _re
+except ImportError:  # pragma: no cover - optional accelerator (pip install ah32[speedups])
+    import re as _re
+
+# Python's Unicode `\s` (incl. the full-width U+3000) spelled out: RE2's `\s` is ASCII-only,
+# and matches must not depend on whether the optional extra is installed.
+_SPACE = "[\t-\r\x1c-\x20\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]"
+_FILL_BLANK_RE = _re.compile(r"_{3,}|＿{3,}|﹍{3,}|\(" + _SPACE + r"*\)")
+
 
 def fill_blank(doc_text: str, context_chars: int = 20) -> Dict[str, Any]:
     text = str(doc_text or "")
+    text_len = len(text)
     window = max(0, int(context_chars or 0))
-    pattern = re.compile(r"_{3,}|＿{3,}|﹍{3,}|\(\s*\)")
 
     items: List[Dict[str, Any]] = []
-    for idx, m in enumerate(pattern.finditer(text), start=1):
+    for idx, m in enumerate(_FILL_BLANK_RE.finditer(text), start=1):
         start, end = m.span()
         items.append(
             {
@@ -19,9 +29,8 @@ def fill_blank(doc_text: str, context_chars: int = 20) -> Dict[str, Any]:
                 "end": end,
                 "placeholder": m.group(0),
                 "before": text[max(0, start - window):start],
-                "after": text[end:min(len(text), end + window)],
+                "after": text[end:min(text_len, end + window)],
             }
         )
 
     return {"fill_blanks": items, "total_count": len(items)}
-
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Any, Dict
 
 
+@lru_cache(maxsize=256)
+def _compile(expr: str) -> re.Pattern[str]:
+    return re.compile(expr)
+
+
 def format_validator(text: str, pattern: str) -> Dict[str, Any]:
     source = str(text or "")
     expr = str(pattern or "")
     if not expr:
         return {"valid": False, "error": "pattern is required"}
     try:
-        ok = bool(re.search(expr, source))
+        ok = bool(_compile(expr).search(source))
         return {"valid": ok, "pattern": expr}
     except Exception as e:
         return {"valid": False, "pattern": expr, "error": str(e)}
-
@@ -5,11 +5,11 @@ from typing import Any, Dict
 
 def number_generator(prefix: str = "NO", start: int = 1, width: int = 4) -> Dict[str, Any]:
     value = max(0, int(start or 0))
-    padded = str(value).zfill(max(1, int(width or 1)))
+    prefix_clean = str(prefix or "").strip()
+    width_i = max(1, int(width or 1))
     return {
-        "prefix": str(prefix or "").strip(),
+        "prefix": prefix_clean,
         "start": value,
-        "width": max(1, int(width or 1)),
-        "number": f"{str(prefix or '').strip()}{padded}",
+        "width": width_i,
+        "number": f"{prefix_clean}{value:0{width_i}d}",
     }
-
@@ -4,15 +4,21 @@ from typing import Any, Dict, List
 
 
 def table_parser(table_text: str, delimiter: str = ",") -> Dict[str, Any]:
-    lines = [line for line in str(table_text or "").splitlines() if line.strip()]
-    if not lines:
-        return {"headers": [], "rows": [], "row_count": 0}
     split = str(delimiter or ",")
-    headers = [h.strip() for h in lines[0].split(split)]
+    # Stream non-blank lines instead of materializing a filtered copy of the table.
+    lines = (line for line in str(table_text or "").splitlines() if line.strip())
+    first = next(lines, None)
+    if first is None:
+        return {"headers": [], "rows": [], "row_count": 0}
+    headers = [h.strip() for h in first.split(split)]
+    headers_tuple = tuple(headers)
+    header_count = len(headers_tuple)
     rows: List[Dict[str, Any]] = []
-    for line in lines[1:]:
+    for line in lines:
         cols = [c.strip() for c in line.split(split)]
-        row = {headers[idx] if idx < len(headers) else f"col_{idx+1}": cols[idx] for idx in range(len(cols))}
+        row = dict(zip(headers_tuple, cols))
+        if len(cols) > header_count:
+            # Cells beyond the header row get positional names.
+            row.update((f"col_{idx}", c) for idx, c in enumerate(cols[header_count:], start=header_count + 1))
         rows.append(row)
     return {"headers": headers, "rows": rows, "row_count": len(rows)}
-
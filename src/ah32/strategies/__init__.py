@@ -26,7 +26,8 @@ from .llm_driven_strategy import (
     ConfidenceLevel,
     ClassificationCategory,
     SimpleClassificationStrategy,
-    classify_conversation
+    classify_conversation,
+    classify_conversation_batch
 )
 
 __all__ = [
@@ -43,5 +44,6 @@ __all__ = [
     'ConfidenceLevel',
     'ClassificationCategory',
     'SimpleClassificationStrategy',
-    'classify_conversation'
+    'classify_conversation',
+    'classify_conversation_batch'
 ]
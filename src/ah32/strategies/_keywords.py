@@ -0,0 +1,196 @@
+"""
+策略关键词表 - 上下文策略与记忆分类策略共用的唯一数据源
+
+两个策略的关键词表用途不同、内容也不完全相同，因此分别命名；
+统一放在这里避免两处定义漂移，并用 sys.intern 让相同的关键词共享同一个字符串对象。
+"""
+
+import sys
+from typing import Tuple
+
+
+def _kw(*keywords: str) -> Tuple[str, ...]:
+    return tuple(sys.intern(k) for k in keywords)
+
+
+# ---------------------------------------------------------------------------
+# 记忆分类（llm_driven_strategy.SimpleClassificationStrategy）
+# ---------------------------------------------------------------------------
+
+# P0 全局记忆关键词
+IDENTITY_KEYWORDS = _kw(
+    "我叫", "我是", "我的名字", "姓名", "公司", "部门", "职位",
+    "我在", "我在X公司", "我是X职位", "联系人", "电话", "邮箱"
+)
+
+QUALIFICATION_KEYWORDS = _kw(
+    "我们公司有", "具有X资质", "营业执照", "资质证书",
+    "我们公司成立于", "主营业务是", "专业领域是",
+    "注册资金", "企业规模", "资质", "认证"
+)
+
+PREFERENCE_KEYWORDS = _kw(
+    "我喜欢", "我希望", "我偏好", "我习惯用", "我通常采用",
+    "我的风格是", "我倾向于", "写作风格", "文档格式",
+    "字体", "格式", "偏好", "喜欢", "希望", "使用"
+)
+
+# P2 跨会话记忆关键词
+PROJECT_KEYWORDS = _kw(
+    "这个项目", "项目名称", "项目编号", "项目ID",
+    "项目预算", "项目金额", "项目投资", "项目工期", "交付时间",
+    "属于X项目", "与X项目相关", "项目", "工期", "预算"
+)
+
+TECHNICAL_KEYWORDS = _kw(
+    "技术要求", "技术规格", "技术参数", "性能指标",
+    "技术标准", "验收标准", "功能要求", "配置要求",
+    "技术方案", "技术路线", "技术栈"
+)
+
+COMMERCIAL_KEYWORDS = _kw(
+    "报价要求", "价格要求", "资质要求", "准入条件",
+    "业绩要求", "项目经验", "付款方式", "结算条件",
+    "质保要求", "售后服务"
+)
+
+EVALUATION_KEYWORDS = _kw(
+    "评标方法", "评分标准", "技术分权重", "商务分权重",
+    "最低价中标", "综合评分法", "评标委员会", "评标程序",
+    "评标", "评分", "打分", "权重"
+)
+
+TIMELINE_KEYWORDS = _kw(
+    "报名时间", "报名截止", "投标截止时间", "递交截止",
+    "开标时间", "开标日期", "评标时间", "定标时间",
+    "截止", "时间", "日期"
+)
+
+DOCUMENT_KEYWORDS = _kw(
+    "合同", "合同文本", "协议", "报价单", "方案", "报告", "简历",
+    "纪要", "邮件", "通知", "公文", "文档", "文件"
+)
+
+# ---------------------------------------------------------------------------
+# 记忆更新判断（context_strategy.ContextStrategy.should_update_*）
+# ---------------------------------------------------------------------------
+
+# 身份信息关键词
+UPDATE_IDENTITY_KEYWORDS = _kw(
+    "我叫",
+    "我是",
+    "我的名字",
+    "姓名",
+    "公司",
+    "部门",
+    "职位",
+    # 常见关系方/角色（不局限招投标）
+    "甲方",
+    "乙方",
+    "客户",
+    "供应商",
+    "招标方",
+    "投标方",
+    "代理机构",
+)
+# 公司资质关键词
+UPDATE_QUALIFICATION_KEYWORDS = _kw(
+    "我们公司有",
+    "具有",
+    "资质",
+    "营业执照",
+    "注册资金",
+    "主营业务",
+    "专业领域",
+)
+# 偏好信息关键词
+UPDATE_PREFERENCE_KEYWORDS = _kw("希望", "喜欢", "偏好", "使用", "采用", "设置", "字体", "风格")
+
+# 项目关联关键词
+UPDATE_PROJECT_KEYWORDS = _kw(
+    "这个项目",
+    "项目名称",
+    "项目编号",
+    "项目预算",
+    "项目工期",
+    "属于X项目",
+)
+# 技术要求关键词
+UPDATE_TECHNICAL_KEYWORDS = _kw(
+    "技术要求",
+    "技术规格",
+    "技术参数",
+    "技术标准",
+    "验收标准",
+    "功能要求",
+)
+# 商务条件关键词
+UPDATE_COMMERCIAL_KEYWORDS = _kw(
+    "报价要求",
+    "价格要求",
+    "资质要求",
+    "业绩要求",
+    "付款方式",
+    "质保要求",
+)
+# 评标标准关键词
+UPDATE_EVALUATION_KEYWORDS = _kw("评标方法", "评分标准", "技术分权重", "商务分权重", "综合评分法")
+# 时间节点关键词
+UPDATE_TIMELINE_KEYWORDS = _kw(
+    "报名时间",
+    "报名截止",
+    "投标截止",
+    "开标时间",
+    "评标时间",
+    "定标时间",
+    "截止日期",
+    "截止时间",
+    "里程碑",
+    "上线时间",
+    "交付时间",
+)
+# 文档相关关键词
+UPDATE_DOCUMENT_KEYWORDS = _kw(
+    "招标文件",
+    "投标文件",
+    "澄清答疑",
+    "修改通知",
+    "补充文件",
+    "中标通知书",
+    "合同",
+    "协议",
+    "方案",
+    "报告",
+    "会议纪要",
+    "制度",
+    "台账",
+)
+
+# ---------------------------------------------------------------------------
+# 查询类型判断（context_strategy.get_query_type）
+# ---------------------------------------------------------------------------
+
+QUERY_USER_INFO_KEYWORDS = _kw(
+    "我是谁", "我的名字", "我叫", "记住", "身份",
+    "我们公司", "资质", "甲方", "乙方", "客户", "供应商", "招标方", "投标方"
+)
+QUERY_ANALYSIS_KEYWORDS = _kw(
+    "分析",
+    "评估",
+    "检查",
+    "对比",
+    "匹配",
+    "合同",
+    "条款",
+    "招标文件",
+    "技术条款",
+)
+QUERY_PROJECT_KEYWORDS = _kw(
+    "这个项目",
+    "项目编号",
+    "项目预算",
+    "项目工期",
+    "里程碑",
+    "技术要求",
+    "评标方法",
+)
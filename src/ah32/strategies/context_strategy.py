@@ -4,8 +4,13 @@
 这个模块定义了信息分类和优先级的策略，确保LLM获得最合适的信息。
 """
 
+import re
 from enum import Enum
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+
+from . import _keywords
 
 
 class InfoPriority(Enum):
@@ -22,40 +27,142 @@ class InfoPriority(Enum):
     EMPTY = "空上下文"
 
 
+# 全局用户记忆的更新类别，按优先级排列：(update_type, confidence, 关键词)
+_GLOBAL_MEMORY_BUCKETS = (
+    ("identity", "high", _keywords.UPDATE_IDENTITY_KEYWORDS),
+    ("qualification", "high", _keywords.UPDATE_QUALIFICATION_KEYWORDS),
+    ("preference", "medium", _keywords.UPDATE_PREFERENCE_KEYWORDS),
+)
+
+# 跨会话记忆的更新类别，按优先级排列
+_CROSS_SESSION_BUCKETS = (
+    ("project", "high", _keywords.UPDATE_PROJECT_KEYWORDS),
+    ("technical", "high", _keywords.UPDATE_TECHNICAL_KEYWORDS),
+    ("commercial", "high", _keywords.UPDATE_COMMERCIAL_KEYWORDS),
+    ("evaluation", "high", _keywords.UPDATE_EVALUATION_KEYWORDS),
+    ("timeline", "high", _keywords.UPDATE_TIMELINE_KEYWORDS),
+    ("document", "high", _keywords.UPDATE_DOCUMENT_KEYWORDS),
+)
+
+
+def _compile_update_buckets(buckets) -> Tuple["re.Pattern[str]", Dict[str, Tuple[int, str, str]]]:
+    """把分桶关键词编译为一个正则，并建立 关键词 -> (优先级, update_type, confidence) 映射
+
+    正则用零宽前瞻在每个位置尝试匹配，交替分支按桶优先级排列，
+    因此重叠的关键词（如“我们公司有”与“公司”）也不会互相遮挡。
+    """
+    lookup: Dict[str, Tuple[int, str, str]] = {}
+    for priority, (update_type, confidence, keywords) in enumerate(buckets):
+        for keyword in keywords:
+            lookup.setdefault(keyword, (priority, update_type, confidence))
+    pattern = re.compile("(?=(" + "|".join(re.escape(k) for k in lookup) + "))")
+    return pattern, lookup
+
+
+def _match_update_bucket(pattern: "re.Pattern[str]", lookup: Dict[str, Tuple[int, str, str]], message: str) -> Dict[str, Any]:
+    """单次扫描消息，返回优先级最高的命中桶"""
+    best: Optional[Tuple[int, str, str]] = None
+    for m in pattern.finditer(message):
+        hit = lookup[m.group(1)]
+        if best is None or hit[0] < best[0]:
+            best = hit
+            if hit[0] == 0:
+                break
+    if best is None:
+        return {
+            "should_update": False,
+            "update_type": "none",
+            "confidence": "low"
+        }
+    return {
+        "should_update": True,
+        "update_type": best[1],
+        "confidence": best[2]
+    }
+
+
+_GLOBAL_MEMORY_RE, _GLOBAL_MEMORY_LOOKUP = _compile_update_buckets(_GLOBAL_MEMORY_BUCKETS)
+_CROSS_SESSION_RE, _CROSS_SESSION_LOOKUP = _compile_update_buckets(_CROSS_SESSION_BUCKETS)
+
+
+# 同一条消息会在多个阶段被重复判断，以消息本身为键缓存；缓存不可变键值对，每次返回新的 dict
+@lru_cache(maxsize=2048)
+def _global_memory_update(message: str) -> Tuple[Tuple[str, Any], ...]:
+    return tuple(_match_update_bucket(_GLOBAL_MEMORY_RE, _GLOBAL_MEMORY_LOOKUP, message).items())
+
+
+@lru_cache(maxsize=2048)
+def _cross_session_update(message: str) -> Tuple[Tuple[str, Any], ...]:
+    return tuple(_match_update_bucket(_CROSS_SESSION_RE, _CROSS_SESSION_LOOKUP, message).items())
+
+
+# 各信息源的说明（只读，供外部查看；模板渲染不依赖它）
+_INFO_SOURCES: Mapping[InfoPriority, Mapping[str, Any]] = MappingProxyType({
+    InfoPriority.P0_IDENTITY: {
+        "name": "全局用户记忆",
+        "storage": "services.memory.get_global_user_memory()",
+        "update_frequency": "on_user_info_change",
+        "cross_session": True,
+        "example": "用户姓名、公司、部门、偏好"
+    },
+    InfoPriority.P1_SESSION: {
+        "name": "短期会话记忆",
+        "storage": "memory.short_term",
+        "update_frequency": "every_interaction",
+        "cross_session": False,
+        "example": "当前任务进度、最近对话"
+    },
+    InfoPriority.P2_HISTORY: {
+        "name": "语义检索记忆",
+        "storage": "memory.semantic.search_conversations()",
+        "update_frequency": "on_query",
+        "cross_session": True,
+        "example": "历史对话、相似问题"
+    },
+    InfoPriority.P3_TOOLS: {
+        "name": "工具执行历史",
+        "storage": "self.tool_calls",
+        "update_frequency": "on_tool_call",
+        "cross_session": False,
+        "example": "已执行工具、结果摘要"
+    }
+})
+
+
+# 各信息源在上下文模板中的固定段落（末尾空行用于分隔下一段）
+_CONTEXT_SECTIONS: Dict[InfoPriority, str] = {
+    InfoPriority.P0_IDENTITY: "\n".join([
+        "=== 当前用户身份 (跨会话共享) ===",
+        "这是用户的个人身份信息，在所有会话中保持一致",
+        "格式: 姓名: 值, 公司: 值, 部门: 值, 职位: 值",
+        "",
+    ]),
+    InfoPriority.P1_SESSION: "\n".join([
+        "=== 当前会话上下文 ===",
+        "这是当前会话的上下文信息，只在当前会话中有效",
+        "格式: 任务: 值, 进度: 值, 文档: 值",
+        "",
+    ]),
+    InfoPriority.P2_HISTORY: "\n".join([
+        "=== 相关历史对话 ===",
+        "这是与当前问题相关的历史对话，提供参考信息",
+        "格式: 会话ID: 值, 时间: 值, 内容: 值",
+        "",
+    ]),
+    InfoPriority.P3_TOOLS: "\n".join([
+        "=== 已执行的工具 ===",
+        "这是最近执行的工具及其结果摘要",
+        "格式: 工具: 值, 参数: 值, 结果: 值",
+        "",
+    ]),
+}
+
+
 class ContextStrategy:
     """上下文构建策略类"""
 
-    def __init__(self):
-        self.info_sources = {
-            InfoPriority.P0_IDENTITY: {
-                "name": "全局用户记忆",
-                "storage": "services.memory.get_global_user_memory()",
-                "update_frequency": "on_user_info_change",
-                "cross_session": True,
-                "example": "用户姓名、公司、部门、偏好"
-            },
-            InfoPriority.P1_SESSION: {
-                "name": "短期会话记忆",
-                "storage": "memory.short_term",
-                "update_frequency": "every_interaction",
-                "cross_session": False,
-                "example": "当前任务进度、最近对话"
-            },
-            InfoPriority.P2_HISTORY: {
-                "name": "语义检索记忆",
-                "storage": "memory.semantic.search_conversations()",
-                "update_frequency": "on_query",
-                "cross_session": True,
-                "example": "历史对话、相似问题"
-            },
-            InfoPriority.P3_TOOLS: {
-                "name": "工具执行历史",
-                "storage": "self.tool_calls",
-                "update_frequency": "on_tool_call",
-                "cross_session": False,
-                "example": "已执行工具、结果摘要"
-            }
-        }
+    # 兼容旧代码通过实例访问 info_sources；数据为模块级只读常量
+    info_sources = _INFO_SOURCES
 
     def get_info_source_for_query(self, query: str, query_type: str) -> List[InfoPriority]:
         """根据查询类型返回应该使用的信息源优先级
@@ -101,53 +208,7 @@ class ContextStrategy:
                 "confidence": "high|medium|low"
             }
         """
-        # 身份信息关键词
-        identity_keywords = [
-            "我叫",
-            "我是",
-            "我的名字",
-            "姓名",
-            "公司",
-            "部门",
-            "职位",
-            # 常见关系方/角色（不局限招投标）
-            "甲方",
-            "乙方",
-            "客户",
-            "供应商",
-            "招标方",
-            "投标方",
-            "代理机构",
-        ]
-        # 偏好信息关键词
-        preference_keywords = ["希望", "喜欢", "偏好", "使用", "采用", "设置", "字体", "风格"]
-        # 公司资质关键词
-        qualification_keywords = ["我们公司有", "具有", "资质", "营业执照", "注册资金", "主营业务", "专业领域"]
-
-        if any(kw in message for kw in identity_keywords):
-            return {
-                "should_update": True,
-                "update_type": "identity",
-                "confidence": "high"
-            }
-        elif any(kw in message for kw in qualification_keywords):
-            return {
-                "should_update": True,
-                "update_type": "qualification",
-                "confidence": "high"
-            }
-        elif any(kw in message for kw in preference_keywords):
-            return {
-                "should_update": True,
-                "update_type": "preference",
-                "confidence": "medium"
-            }
-        else:
-            return {
-                "should_update": False,
-                "update_type": "none",
-                "confidence": "low"
-            }
+        return dict(_global_memory_update(message))
 
     def should_update_cross_session_memory(self, message: str) -> Dict[str, Any]:
         """判断消息是否包含需要更新跨会话记忆的信息（通用办公场景）
@@ -159,87 +220,7 @@ class ContextStrategy:
                 "confidence": "high|medium|low"
             }
         """
-        # 项目关联关键词
-        project_keywords = ["这个项目", "项目名称", "项目编号", "项目预算", "项目工期", "属于X项目"]
-        # 技术要求关键词
-        technical_keywords = ["技术要求", "技术规格", "技术参数", "技术标准", "验收标准", "功能要求"]
-        # 商务条件关键词
-        commercial_keywords = ["报价要求", "价格要求", "资质要求", "业绩要求", "付款方式", "质保要求"]
-        # 评标标准关键词
-        evaluation_keywords = ["评标方法", "评分标准", "技术分权重", "商务分权重", "综合评分法"]
-        # 时间节点关键词
-        timeline_keywords = [
-            "报名时间",
-            "报名截止",
-            "投标截止",
-            "开标时间",
-            "评标时间",
-            "定标时间",
-            "截止日期",
-            "截止时间",
-            "里程碑",
-            "上线时间",
-            "交付时间",
-        ]
-        # 文档相关关键词
-        document_keywords = [
-            "招标文件",
-            "投标文件",
-            "澄清答疑",
-            "修改通知",
-            "补充文件",
-            "中标通知书",
-            "合同",
-            "协议",
-            "方案",
-            "报告",
-            "会议纪要",
-            "制度",
-            "台账",
-        ]
-
-        if any(kw in message for kw in project_keywords):
-            return {
-                "should_update": True,
-                "update_type": "project",
-                "confidence": "high"
-            }
-        elif any(kw in message for kw in technical_keywords):
-            return {
-                "should_update": True,
-                "update_type": "technical",
-                "confidence": "high"
-            }
-        elif any(kw in message for kw in commercial_keywords):
-            return {
-                "should_update": True,
-                "update_type": "commercial",
-                "confidence": "high"
-            }
-        elif any(kw in message for kw in evaluation_keywords):
-            return {
-                "should_update": True,
-                "update_type": "evaluation",
-                "confidence": "high"
-            }
-        elif any(kw in message for kw in timeline_keywords):
-            return {
-                "should_update": True,
-                "update_type": "timeline",
-                "confidence": "high"
-            }
-        elif any(kw in message for kw in document_keywords):
-            return {
-                "should_update": True,
-                "update_type": "document",
-                "confidence": "high"
-            }
-        else:
-            return {
-                "should_update": False,
-                "update_type": "none",
-                "confidence": "low"
-            }
+        return dict(_cross_session_update(message))
 
     def get_context_template(self, priority_order: List[InfoPriority]) -> str:
         """获取上下文构建模板
@@ -250,54 +231,41 @@ class ContextStrategy:
         Returns:
             格式化的上下文模板
         """
-        template_parts = []
-
-        for priority in priority_order:
-            source_info = self.info_sources[priority]
-
-            if priority == InfoPriority.P0_IDENTITY:
-                template_parts.append("=== 当前用户身份 (跨会话共享) ===")
-                template_parts.append("这是用户的个人身份信息，在所有会话中保持一致")
-                template_parts.append("格式: 姓名: 值, 公司: 值, 部门: 值, 职位: 值")
-                template_parts.append("")
-
-            elif priority == InfoPriority.P1_SESSION:
-                template_parts.append("=== 当前会话上下文 ===")
-                template_parts.append("这是当前会话的上下文信息，只在当前会话中有效")
-                template_parts.append("格式: 任务: 值, 进度: 值, 文档: 值")
-                template_parts.append("")
-
-            elif priority == InfoPriority.P2_HISTORY:
-                template_parts.append("=== 相关历史对话 ===")
-                template_parts.append("这是与当前问题相关的历史对话，提供参考信息")
-                template_parts.append("格式: 会话ID: 值, 时间: 值, 内容: 值")
-                template_parts.append("")
-
-            elif priority == InfoPriority.P3_TOOLS:
-                template_parts.append("=== 已执行的工具 ===")
-                template_parts.append("这是最近执行的工具及其结果摘要")
-                template_parts.append("格式: 工具: 值, 参数: 值, 结果: 值")
-                template_parts.append("")
-
-        return "\n".join(template_parts)
+        return "\n".join(_CONTEXT_SECTIONS[p] for p in priority_order if p in _CONTEXT_SECTIONS)
 
 
 # 全局策略实例
 context_strategy = ContextStrategy()
 
 
+# 查询类型按优先级排列；命名分组放在零宽前瞻里，每个位置都尝试匹配，避免重叠关键词互相遮挡
+_QUERY_TYPES = (
+    ("user_info", _keywords.QUERY_USER_INFO_KEYWORDS),
+    ("project", _keywords.QUERY_PROJECT_KEYWORDS),
+    ("analysis", _keywords.QUERY_ANALYSIS_KEYWORDS),
+)
+_QUERY_TYPE_RANK = {name: rank for rank, (name, _kws) in enumerate(_QUERY_TYPES)}
+_QUERY_TYPE_ALTERNATION = "|".join(
+    f"(?P<{name}>{'|'.join(map(re.escape, kws))})" for name, kws in _QUERY_TYPES
+)
+_QUERY_TYPE_RE = re.compile(f"(?={_QUERY_TYPE_ALTERNATION})")
+
+
+@lru_cache(maxsize=4096)
 def get_query_type(message: str) -> str:
     """根据消息内容判断查询类型（通用办公场景）"""
-    user_info_keywords = ["我是谁", "我的名字", "我叫", "记住", "身份",
-                         "我们公司", "资质", "甲方", "乙方", "客户", "供应商", "招标方", "投标方"]
-    analysis_keywords = ["分析", "评估", "检查", "对比", "匹配", "合同", "条款", "招标文件", "技术条款"]
-    project_keywords = ["这个项目", "项目编号", "项目预算", "项目工期", "里程碑", "技术要求", "评标方法"]
-
-    if any(kw in message for kw in user_info_keywords):
-        return "user_info"
-    elif any(kw in message for kw in project_keywords):
-        return "project"
-    elif any(kw in message for kw in analysis_keywords):
-        return "analysis"
-    else:
-        return "regular"
+    best: Optional[str] = None
+    for m in _QUERY_TYPE_RE.finditer(message):
+        name = m.lastgroup
+        if best is None or _QUERY_TYPE_RANK[name] < _QUERY_TYPE_RANK[best]:
+            best = name
+            if _QUERY_TYPE_RANK[name] == 0:
+                break
+    return best or "regular"
+
+
+def clear_caches() -> None:
+    """清空消息判断缓存（关键词变更后、以及测试中使用）"""
+    get_query_type.cache_clear()
+    _global_memory_update.cache_clear()
+    _cross_session_update.cache_clear()
@@ -5,9 +5,20 @@
 """
 
 import logging
-from typing import Dict, Any
+import re
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from enum import Enum
 
+from ah32._internal.json_codec import dumps_indented
+
+from . import _keywords
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional accelerator (pip install ah32[speedups])
+    ahocorasick = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,6 +53,16 @@ class ClassificationCategory(Enum):
 class MemoryClassificationResult:
     """记忆分类结果（通用办公场景）"""
 
+    __slots__ = (
+        "storage_level",
+        "confidence",
+        "reasoning",
+        "keywords_detected",
+        "category",
+        "should_promote",
+        "promote_reason",
+    )
+
     def __init__(self, data: Dict[str, Any]):
         self.storage_level = StorageLevel(data.get("storage_level", "P1_会话记忆"))
         self.confidence = ConfidenceLevel(data.get("confidence", "medium"))
@@ -51,6 +72,28 @@ class MemoryClassificationResult:
         self.should_promote = data.get("should_promote", False)
         self.promote_reason = data.get("promote_reason", "")
 
+    @classmethod
+    def from_members(
+        cls,
+        storage_level: StorageLevel,
+        confidence: ConfidenceLevel,
+        category: ClassificationCategory,
+        reasoning: str = "",
+        keywords_detected: Optional[List[str]] = None,
+        should_promote: bool = False,
+        promote_reason: str = "",
+    ) -> "MemoryClassificationResult":
+        """直接用枚举成员构造结果，跳过字典解析与 Enum 值查找（内部分类器使用）"""
+        result = cls.__new__(cls)
+        result.storage_level = storage_level
+        result.confidence = confidence
+        result.reasoning = reasoning
+        result.keywords_detected = keywords_detected if keywords_detected is not None else []
+        result.category = category
+        result.should_promote = should_promote
+        result.promote_reason = promote_reason
+        return result
+
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         return {
@@ -64,8 +107,7 @@ class MemoryClassificationResult:
         }
 
     def __str__(self) -> str:
-        import json
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        return dumps_indented(self.to_dict())
 
 
 # Backward-compatible alias (older code may still import this name).
@@ -76,187 +118,182 @@ class SimpleClassificationStrategy:
     """简化的记忆分类策略 - 基于关键词匹配"""
 
     # P0 全局记忆关键词
-    IDENTITY_KEYWORDS = [
-        "我叫", "我是", "我的名字", "姓名", "公司", "部门", "职位",
-        "我在", "我在X公司", "我是X职位", "联系人", "电话", "邮箱"
-    ]
-
-    QUALIFICATION_KEYWORDS = [
-        "我们公司有", "具有X资质", "营业执照", "资质证书",
-        "我们公司成立于", "主营业务是", "专业领域是",
-        "注册资金", "企业规模", "资质", "认证"
-    ]
-
-    PREFERENCE_KEYWORDS = [
-        "我喜欢", "我希望", "我偏好", "我习惯用", "我通常采用",
-        "我的风格是", "我倾向于", "写作风格", "文档格式",
-        "字体", "格式", "偏好", "喜欢", "希望", "使用"
-    ]
+    IDENTITY_KEYWORDS = _keywords.IDENTITY_KEYWORDS
+    QUALIFICATION_KEYWORDS = _keywords.QUALIFICATION_KEYWORDS
+    PREFERENCE_KEYWORDS = _keywords.PREFERENCE_KEYWORDS
 
     # P2 跨会话记忆关键词
-    PROJECT_KEYWORDS = [
-        "这个项目", "项目名称", "项目编号", "项目ID",
-        "项目预算", "项目金额", "项目投资", "项目工期", "交付时间",
-        "属于X项目", "与X项目相关", "项目", "工期", "预算"
-    ]
-
-    TECHNICAL_KEYWORDS = [
-        "技术要求", "技术规格", "技术参数", "性能指标",
-        "技术标准", "验收标准", "功能要求", "配置要求",
-        "技术方案", "技术路线", "技术栈"
-    ]
-
-    COMMERCIAL_KEYWORDS = [
-        "报价要求", "价格要求", "资质要求", "准入条件",
-        "业绩要求", "项目经验", "付款方式", "结算条件",
-        "质保要求", "售后服务"
-    ]
-
-    EVALUATION_KEYWORDS = [
-        "评标方法", "评分标准", "技术分权重", "商务分权重",
-        "最低价中标", "综合评分法", "评标委员会", "评标程序",
-        "评标", "评分", "打分", "权重"
-    ]
-
-    TIMELINE_KEYWORDS = [
-        "报名时间", "报名截止", "投标截止时间", "递交截止",
-        "开标时间", "开标日期", "评标时间", "定标时间",
-        "截止", "时间", "日期"
-    ]
-
-    DOCUMENT_KEYWORDS = [
-        "合同", "合同文本", "协议", "报价单", "方案", "报告", "简历",
-        "纪要", "邮件", "通知", "公文", "文档", "文件"
-    ]
+    PROJECT_KEYWORDS = _keywords.PROJECT_KEYWORDS
+    TECHNICAL_KEYWORDS = _keywords.TECHNICAL_KEYWORDS
+    COMMERCIAL_KEYWORDS = _keywords.COMMERCIAL_KEYWORDS
+    EVALUATION_KEYWORDS = _keywords.EVALUATION_KEYWORDS
+    TIMELINE_KEYWORDS = _keywords.TIMELINE_KEYWORDS
+    DOCUMENT_KEYWORDS = _keywords.DOCUMENT_KEYWORDS
+
+    # 分类规则，按优先级排列：(关键词列表属性名, 类别, 存储层级, 分类依据, 提升原因)
+    _RULES = (
+        ("IDENTITY_KEYWORDS", ClassificationCategory.IDENTITY, StorageLevel.P0_GLOBAL,
+         "包含身份关键词", "包含用户身份信息"),
+        ("QUALIFICATION_KEYWORDS", ClassificationCategory.QUALIFICATION, StorageLevel.P0_GLOBAL,
+         "包含公司资质关键词", "包含公司资质信息"),
+        ("PREFERENCE_KEYWORDS", ClassificationCategory.PREFERENCE, StorageLevel.P0_GLOBAL,
+         "包含偏好设置关键词", "包含用户偏好设置"),
+        ("PROJECT_KEYWORDS", ClassificationCategory.PROJECT, StorageLevel.P2_CROSS_SESSION,
+         "包含项目关键词", "包含项目信息"),
+        ("TECHNICAL_KEYWORDS", ClassificationCategory.TECHNICAL, StorageLevel.P2_CROSS_SESSION,
+         "包含技术要求关键词", "包含技术规格信息"),
+        ("COMMERCIAL_KEYWORDS", ClassificationCategory.COMMERCIAL, StorageLevel.P2_CROSS_SESSION,
+         "包含商务条件关键词", "包含商务条件信息"),
+        ("EVALUATION_KEYWORDS", ClassificationCategory.EVALUATION, StorageLevel.P2_CROSS_SESSION,
+         "包含评标标准关键词", "包含评标标准信息"),
+        ("TIMELINE_KEYWORDS", ClassificationCategory.TIMELINE, StorageLevel.P2_CROSS_SESSION,
+         "包含时间节点关键词", "包含时间节点信息"),
+        ("DOCUMENT_KEYWORDS", ClassificationCategory.DOCUMENT, StorageLevel.P2_CROSS_SESSION,
+         "包含文档关键词", "包含文档信息"),
+    )
 
     @staticmethod
     def classify_message(message: str) -> BiddingClassificationResult:
         """基于关键词匹配分类消息"""
         logger.debug(f"开始分类消息: {message[:50]}...")
 
-        # P0 全局记忆检查
-        if SimpleClassificationStrategy._check_keywords(message, SimpleClassificationStrategy.IDENTITY_KEYWORDS):
-            return BiddingClassificationResult({
-                "storage_level": "P0_全局记忆",
-                "confidence": "high",
-                "reasoning": "包含身份关键词",
-                "keywords_detected": SimpleClassificationStrategy._get_matched_keywords(message, SimpleClassificationStrategy.IDENTITY_KEYWORDS),
-                "category": "identity",
-                "should_promote": True,
-                "promote_reason": "包含用户身份信息"
-            })
-
-        if SimpleClassificationStrategy._check_keywords(message, SimpleClassificationStrategy.QUALIFICATION_KEYWORDS):
-            return BiddingClassificationResult({
-                "storage_level": "P0_全局记忆",
-                "confidence": "high",
-                "reasoning": "包含公司资质关键词",
-                "keywords_detected": SimpleClassificationStrategy._get_matched_keywords(message, SimpleClassificationStrategy.QUALIFICATION_KEYWORDS),
-                "category": "qualification",
-                "should_promote": True,
-                "promote_reason": "包含公司资质信息"
-            })
-
-        if SimpleClassificationStrategy._check_keywords(message, SimpleClassificationStrategy.PREFERENCE_KEYWORDS):
-            return BiddingClassificationResult({
-                "storage_level": "P0_全局记忆",
-                "confidence": "high",
-                "reasoning": "包含偏好设置关键词",
-                "keywords_detected": SimpleClassificationStrategy._get_matched_keywords(message, SimpleClassificationStrategy.PREFERENCE_KEYWORDS),
-                "category": "preference",
-                "should_promote": True,
-                "promote_reason": "包含用户偏好设置"
-            })
-
-        # P2 跨会话记忆检查
-        if SimpleClassificationStrategy._check_keywords(message, SimpleClassificationStrategy.PROJECT_KEYWORDS):
-            return BiddingClassificationResult({
-                "storage_level": "P2_跨会话记忆",
-                "confidence": "high",
-                "reasoning": "包含项目关键词",
-                "keywords_detected": SimpleClassificationStrategy._get_matched_keywords(message, SimpleClassificationStrategy.PROJECT_KEYWORDS),
-                "category": "project",
-                "should_promote": True,
-                "promote_reason": "包含项目信息"
-            })
-
-        if SimpleClassificationStrategy._check_keywords(message, SimpleClassificationStrategy.TECHNICAL_KEYWORDS):
-            return BiddingClassificationResult({
-                "storage_level": "P2_跨会话记忆",
-                "confidence": "high",
-                "reasoning": "包含技术要求关键词",
-                "keywords_detected": SimpleClassificationStrategy._get_matched_keywords(message, SimpleClassificationStrategy.TECHNICAL_KEYWORDS),
-                "category": "technical",
-                "should_promote": True,
-                "promote_reason": "包含技术规格信息"
-            })
-
-        if SimpleClassificationStrategy._check_keywords(message, SimpleClassificationStrategy.COMMERCIAL_KEYWORDS):
-            return BiddingClassificationResult({
-                "storage_level": "P2_跨会话记忆",
-                "confidence": "high",
-                "reasoning": "包含商务条件关键词",
-                "keywords_detected": SimpleClassificationStrategy._get_matched_keywords(message, SimpleClassificationStrategy.COMMERCIAL_KEYWORDS),
-                "category": "commercial",
-                "should_promote": True,
-                "promote_reason": "包含商务条件信息"
-            })
-
-        if SimpleClassificationStrategy._check_keywords(message, SimpleClassificationStrategy.EVALUATION_KEYWORDS):
-            return BiddingClassificationResult({
-                "storage_level": "P2_跨会话记忆",
-                "confidence": "high",
-                "reasoning": "包含评标标准关键词",
-                "keywords_detected": SimpleClassificationStrategy._get_matched_keywords(message, SimpleClassificationStrategy.EVALUATION_KEYWORDS),
-                "category": "evaluation",
-                "should_promote": True,
-                "promote_reason": "包含评标标准信息"
-            })
-
-        if SimpleClassificationStrategy._check_keywords(message, SimpleClassificationStrategy.TIMELINE_KEYWORDS):
-            return BiddingClassificationResult({
-                "storage_level": "P2_跨会话记忆",
-                "confidence": "high",
-                "reasoning": "包含时间节点关键词",
-                "keywords_detected": SimpleClassificationStrategy._get_matched_keywords(message, SimpleClassificationStrategy.TIMELINE_KEYWORDS),
-                "category": "timeline",
-                "should_promote": True,
-                "promote_reason": "包含时间节点信息"
-            })
-
-        if SimpleClassificationStrategy._check_keywords(message, SimpleClassificationStrategy.DOCUMENT_KEYWORDS):
-            return BiddingClassificationResult({
-                "storage_level": "P2_跨会话记忆",
-                "confidence": "high",
-                "reasoning": "包含文档关键词",
-                "keywords_detected": SimpleClassificationStrategy._get_matched_keywords(message, SimpleClassificationStrategy.DOCUMENT_KEYWORDS),
-                "category": "document",
-                "should_promote": True,
-                "promote_reason": "包含文档信息"
-            })
-
-        # 默认归类为P1会话记忆
-        return BiddingClassificationResult({
-            "storage_level": "P1_会话记忆",
-            "confidence": "medium",
-            "reasoning": "默认归类为会话记忆",
-            "keywords_detected": [],
-            "category": "regular",
-            "should_promote": False,
-            "promote_reason": "常规对话内容"
-        })
+        return SimpleClassificationStrategy._build_result(_classify_cached(message))
+
+    @staticmethod
+    def classify_batch(messages: List[str]) -> List[BiddingClassificationResult]:
+        """批量分类（如同一轮的用户/助手消息），结果顺序与输入一致"""
+        build = SimpleClassificationStrategy._build_result
+        return [build(_classify_cached(message)) for message in messages]
+
+    @staticmethod
+    def _build_result(hit: Optional[Tuple[int, Tuple[str, ...]]]) -> BiddingClassificationResult:
+        """由命中结果构造分类结果对象"""
+        if hit is None:
+            # 默认归类为P1会话记忆
+            return BiddingClassificationResult.from_members(
+                StorageLevel.P1_SESSION,
+                ConfidenceLevel.MEDIUM,
+                ClassificationCategory.REGULAR,
+                reasoning="默认归类为会话记忆",
+                keywords_detected=[],
+                should_promote=False,
+                promote_reason="常规对话内容",
+            )
+
+        rule_idx, matched = hit
+        rule = SimpleClassificationStrategy._RULES[rule_idx]
+        _attr, category, storage_level, reasoning, promote_reason = rule
+        return BiddingClassificationResult.from_members(
+            storage_level,
+            ConfidenceLevel.HIGH,
+            category,
+            reasoning=reasoning,
+            keywords_detected=list(matched),
+            should_promote=True,
+            promote_reason=promote_reason,
+        )
 
     @staticmethod
-    def _check_keywords(message: str, keywords: list) -> bool:
-        """检查消息是否包含关键词"""
-        return any(keyword in message for keyword in keywords)
+    def _match_rule(message: str) -> Optional[Tuple[int, List[str]]]:
+        """返回优先级最高的命中规则下标及其命中的关键词（按关键词列表顺序）"""
+        rules = SimpleClassificationStrategy._RULES
+        automaton = _AUTOMATON
+        if automaton is None:
+            # 首字符预筛：消息中不含某类任何关键词的首字符时，整类跳过
+            chars = set(message)
+            for rule_idx, rule in enumerate(rules):
+                if _RULE_FIRST_CHARS[rule_idx].isdisjoint(chars):
+                    continue
+                if _RULE_PATTERNS[rule_idx].search(message):
+                    keywords = getattr(SimpleClassificationStrategy, rule[0])
+                    matched = SimpleClassificationStrategy._get_matched_keywords(message, keywords)
+                    return rule_idx, matched
+            return None
+
+        # 单次线性扫描收集所有命中，再取优先级最高的规则
+        hits = {entry for _end, entries in automaton.iter(message) for entry in entries}
+        if not hits:
+            return None
+        best = min(rule_idx for rule_idx, _kw_idx in hits)
+        keywords = getattr(SimpleClassificationStrategy, rules[best][0])
+        return best, [keywords[kw_idx] for rule_idx, kw_idx in sorted(hits) if rule_idx == best]
 
     @staticmethod
-    def _get_matched_keywords(message: str, keywords: list) -> list:
-        """获取匹配到的关键词"""
+    def _get_matched_keywords(message: str, keywords: Sequence[str]) -> List[str]:
+        """获取匹配到的关键词（仅对命中的类别调用；包含关系的关键词需全部列出，不能用 findall）"""
         return [keyword for keyword in keywords if keyword in message]
 
 
+def _build_rule_first_chars() -> Tuple[frozenset, ...]:
+    """每条规则的关键词首字符集合，供未安装 pyahocorasick 时的逐类扫描做预筛"""
+    return tuple(
+        frozenset(keyword[0] for keyword in getattr(SimpleClassificationStrategy, rule[0]))
+        for rule in SimpleClassificationStrategy._RULES
+    )
+
+
+def _build_rule_patterns() -> Tuple["re.Pattern[str]", ...]:
+    """每条规则的关键词交替正则（长词优先），未安装 pyahocorasick 时用一次 C 层搜索判断是否命中"""
+    patterns = []
+    for rule in SimpleClassificationStrategy._RULES:
+        keywords = sorted(getattr(SimpleClassificationStrategy, rule[0]), key=len, reverse=True)
+        patterns.append(re.compile("|".join(map(re.escape, keywords))))
+    return tuple(patterns)
+
+
+def _build_automaton() -> Optional["ahocorasick.Automaton"]:
+    """把所有分类关键词编译进一个 Aho-Corasick 自动机；未安装 pyahocorasick 时返回 None。"""
+    if ahocorasick is None:
+        return None
+    # 同一关键词可能出现在多个列表中，payload 保存全部 (规则下标, 关键词下标)
+    entries: Dict[str, List[Tuple[int, int]]] = {}
+    for rule_idx, rule in enumerate(SimpleClassificationStrategy._RULES):
+        for kw_idx, keyword in enumerate(getattr(SimpleClassificationStrategy, rule[0])):
+            entries.setdefault(keyword, []).append((rule_idx, kw_idx))
+    automaton = ahocorasick.Automaton()
+    for keyword, payload in entries.items():
+        automaton.add_word(keyword, tuple(payload))
+    automaton.make_automaton()
+    return automaton
+
+
+# 模块导入时构建一次，所有分类操作共享（只读，多线程安全）
+_RULE_FIRST_CHARS = _build_rule_first_chars()
+_RULE_PATTERNS = _build_rule_patterns()
+_AUTOMATON = _build_automaton()
+
+
+def get_automaton() -> Optional["ahocorasick.Automaton"]:
+    """返回共享的关键词自动机（未安装 pyahocorasick 时为 None）"""
+    return _AUTOMATON
+
+
+def rebuild_automaton() -> None:
+    """运行时修改 SimpleClassificationStrategy.*_KEYWORDS 后必须调用
+
+    先完整构建新结构再整体替换引用，读取方不加锁也不会看到半成品；最后清空分类缓存。
+    """
+    global _RULE_FIRST_CHARS, _RULE_PATTERNS, _AUTOMATON
+    _RULE_FIRST_CHARS = _build_rule_first_chars()
+    _RULE_PATTERNS = _build_rule_patterns()
+    _AUTOMATON = _build_automaton()
+    clear_caches()
+
+
+@lru_cache(maxsize=2048)
+def _classify_cached(message: str) -> Optional[Tuple[int, Tuple[str, ...]]]:
+    """缓存分类命中结果；只缓存不可变元组，结果对象每次重新构造，调用方可以放心修改"""
+    hit = SimpleClassificationStrategy._match_rule(message)
+    if hit is None:
+        return None
+    return hit[0], tuple(hit[1])
+
+
+def clear_caches() -> None:
+    """清空分类缓存（关键词或自动机变更后、以及测试中使用）"""
+    _classify_cached.cache_clear()
+
+
 # 全局简分类策略实例
 simple_strategy = SimpleClassificationStrategy()
 
@@ -271,6 +308,11 @@ def classify_conversation(message: str) -> BiddingClassificationResult:
     return SimpleClassificationStrategy.classify_message(message)
 
 
+def classify_conversation_batch(messages: List[str]) -> List[BiddingClassificationResult]:
+    """批量对话分类"""
+    return SimpleClassificationStrategy.classify_batch(messages)
+
+
 def get_storage_level(result: BiddingClassificationResult) -> str:
     """获取存储层级"""
     return result.storage_level.value
@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import copy
-import json
 from typing import Any, Dict, Optional
 
 
@@ -9,21 +7,35 @@ STYLE_SPEC_SCHEMA_V1 = "ah32.styleSpec.v1"
 
 
 def _deep_merge(base: dict, override: dict) -> dict:
-    """Merge override into base (dict-only; lists are replaced)."""
-    out = copy.deepcopy(base or {})
+    """Merge override into base (dict-only; lists are replaced).
+
+    Neither input is mutated. Values taken from override are copied, so the result never
+    aliases the (caller-supplied) override; subtrees of base that override does not touch
+    are shared with base, which callers pass as a fresh default_style_spec_v1() copy.
+    """
+    out = dict(base or {})
     for k, v in (override or {}).items():
         if v is None:
             continue
-        if isinstance(v, dict) and isinstance(out.get(k), dict):
-            out[k] = _deep_merge(out.get(k) or {}, v)
+        cur = out.get(k)
+        if isinstance(v, dict) and isinstance(cur, dict):
+            out[k] = _deep_merge(cur, v)
         else:
-            out[k] = v
+            out[k] = _dict_copy(v)
     return out
 
 
-def default_style_spec_v1(*, host_app: str | None = None) -> dict:
-    """Return a conservative default StyleSpec for a given host (best-effort)."""
-    host = (host_app or "").strip().lower()
+def _dict_copy(value: Any) -> Any:
+    """Copy the dict/list skeleton of a JSON-like tree (leaves are immutable scalars)."""
+    if isinstance(value, dict):
+        return {k: _dict_copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_dict_copy(v) for v in value]
+    return value
+
+
+def _build_default_style_spec(host: str) -> dict:
+    """Build the canonical default StyleSpec for a normalized host."""
     common = {
         "schema": STYLE_SPEC_SCHEMA_V1,
         "name": "default_v1",
@@ -67,7 +79,7 @@ def default_style_spec_v1(*, host_app: str | None = None) -> dict:
         return {k: common[k] for k in ("schema", "name", "palette", "font", "writer")}
     if host in ("et", "excel"):
         # ET prefers western UI fonts; keep body/title but leave common palette.
-        et = copy.deepcopy(common)
+        et = dict(common)
         et["font"] = {
             "body": {"name": "Segoe UI", "size": 11},
             "title": {"name": "Segoe UI", "size": 14, "bold": True},
@@ -79,6 +91,64 @@ def default_style_spec_v1(*, host_app: str | None = None) -> dict:
     return common
 
 
+# Defaults for every known host, built once at import; never handed out without a copy.
+_DEFAULT_BY_HOST: Dict[str, dict] = {
+    host: _build_default_style_spec(host)
+    for host in ("", "wps", "writer", "et", "excel", "wpp", "ppt", "powerpoint")
+}
+
+
+def default_style_spec_v1(*, host_app: str | None = None) -> dict:
+    """Return a conservative default StyleSpec for a given host (best-effort)."""
+    host = (host_app or "").strip().lower()
+    return _dict_copy(_DEFAULT_BY_HOST.get(host) or _DEFAULT_BY_HOST[""])
+
+
+# Top-level keys that trigger back-compat migration in normalize_style_spec.
+_LEGACY_KEYS = frozenset({
+    "schema_version", "styleSpec",
+    "paragraph", "table",
+    "sheet", "numberFormat", "number_format", "chart",
+    "deck", "slide", "layout", "shape",
+})
+
+_ALLOWED_TOP = frozenset({"schema", "name", "palette", "font", "writer", "et", "wpp"})
+
+
+def _allowed_sections(host: str) -> frozenset:
+    """Top-level sections kept for a normalized host (other hosts' sections are dropped)."""
+    if host in ("wps", "writer"):
+        return _ALLOWED_TOP - {"et", "wpp"}
+    if host in ("et", "excel"):
+        return _ALLOWED_TOP - {"writer", "wpp"}
+    if host in ("wpp", "ppt", "powerpoint"):
+        return _ALLOWED_TOP - {"writer", "et"}
+    return _ALLOWED_TOP
+
+
+def _pop_dict(d: dict, key: str) -> dict | None:
+    """Pop d[key] only when it is a dict; otherwise leave it in place and return None."""
+    v = d.get(key)
+    if isinstance(v, dict):
+        del d[key]
+        return v
+    return None
+
+
+def _pop_dicts(d: dict, keys: tuple) -> dict:
+    """Move the dict-valued `keys` out of d into a new section dict (key order preserved)."""
+    section: dict = {}
+    for key in keys:
+        v = _pop_dict(d, key)
+        if v is not None:
+            section[key] = v
+    return section
+
+
+def _is_nonempty_str(value: Any) -> bool:
+    return isinstance(value, str) and bool(value)
+
+
 def normalize_style_spec(raw: Any, *, host_app: str | None = None) -> Optional[Dict[str, Any]]:
     """Normalize a StyleSpec payload into v1 shape (best-effort, never raises).
 
@@ -95,6 +165,8 @@ def normalize_style_spec(raw: Any, *, host_app: str | None = None) -> Optional[D
             s = raw.strip()
             if not s:
                 return None
+            import json  # only the JSON-string payload path needs it
+
             try:
                 raw = json.loads(s)
             except Exception:
@@ -103,47 +175,45 @@ def normalize_style_spec(raw: Any, *, host_app: str | None = None) -> Optional[D
         if not isinstance(raw, dict):
             return None
 
-        spec = copy.deepcopy(raw)
+        host = (host_app or "").strip().lower()
+        if (
+            raw.get("schema") == STYLE_SPEC_SCHEMA_V1
+            and _is_nonempty_str(raw.get("name"))
+            and not (raw.keys() & _LEGACY_KEYS)
+        ):
+            # Fast path: already v1-shaped. Drop foreign sections first, then only merge defaults.
+            allowed = _allowed_sections(host)
+            own = {k: v for k, v in raw.items() if k in allowed}
+            return _deep_merge(default_style_spec_v1(host_app=host), own)
+
+        # Shallow copy is enough: legacy migration only pops/sets top-level keys,
+        # and _deep_merge never mutates its inputs.
+        spec = dict(raw)
 
         # Back-compat aliases
         if "schema_version" in spec and "schema" not in spec:
             spec["schema"] = spec.get("schema_version")
         if "styleSpec" in spec and "schema" not in spec and isinstance(spec.get("styleSpec"), dict):
             # Some clients wrap it as {styleSpec:{...}}
-            spec = spec.get("styleSpec") or spec
+            spec = dict(spec.get("styleSpec") or spec)
 
         # Legacy flat host fields -> nested sections
         if ("paragraph" in spec or "table" in spec) and "writer" not in spec:
-            writer: dict = {}
-            if isinstance(spec.get("paragraph"), dict):
-                writer["paragraph"] = spec.pop("paragraph")
-            if isinstance(spec.get("table"), dict):
-                writer["table"] = spec.pop("table")
+            writer = _pop_dicts(spec, ("paragraph", "table"))
             if writer:
                 spec["writer"] = writer
 
         if ("sheet" in spec or "numberFormat" in spec or "number_format" in spec or "chart" in spec) and "et" not in spec:
-            et: dict = {}
-            if isinstance(spec.get("sheet"), dict):
-                et["sheet"] = spec.pop("sheet")
+            et = _pop_dicts(spec, ("sheet",))
             nf = spec.pop("numberFormat", None) or spec.pop("number_format", None)
             if isinstance(nf, dict):
                 et["numberFormat"] = nf
-            if isinstance(spec.get("chart"), dict):
-                et["chart"] = spec.pop("chart")
+            et.update(_pop_dicts(spec, ("chart",)))
             if et:
                 spec["et"] = et
 
         if ("deck" in spec or "slide" in spec or "layout" in spec or "shape" in spec) and "wpp" not in spec:
-            wpp: dict = {}
-            if isinstance(spec.get("deck"), dict):
-                wpp["deck"] = spec.pop("deck")
-            if isinstance(spec.get("slide"), dict):
-                wpp["slide"] = spec.pop("slide")
-            if isinstance(spec.get("layout"), dict):
-                wpp["layout"] = spec.pop("layout")
-            if isinstance(spec.get("shape"), dict):
-                wpp["shape"] = spec.pop("shape")
+            wpp = _pop_dicts(spec, ("deck", "slide", "layout", "shape"))
             if wpp:
                 spec["wpp"] = wpp
 
@@ -154,24 +224,12 @@ def normalize_style_spec(raw: Any, *, host_app: str | None = None) -> Optional[D
             spec["name"] = "default_v1"
 
         # Merge defaults (host-specific baseline) then override with user values.
-        base = default_style_spec_v1(host_app=host_app)
+        base = default_style_spec_v1(host_app=host)
         merged = _deep_merge(base, spec)
 
-        # Reduce bloat: keep only known top-level sections.
-        allowed_top = {"schema", "name", "palette", "font", "writer", "et", "wpp"}
-        merged = {k: v for k, v in merged.items() if k in allowed_top}
-
-        # Filter by host when requested.
-        host = (host_app or "").strip().lower()
-        if host in ("wps", "writer"):
-            merged.pop("et", None)
-            merged.pop("wpp", None)
-        elif host in ("et", "excel"):
-            merged.pop("writer", None)
-            merged.pop("wpp", None)
-        elif host in ("wpp", "ppt", "powerpoint"):
-            merged.pop("writer", None)
-            merged.pop("et", None)
+        # Reduce bloat: keep only known top-level sections, filtered by host when requested.
+        allowed = _allowed_sections(host)
+        merged = {k: v for k, v in merged.items() if k in allowed}
 
         return merged
     except Exception:
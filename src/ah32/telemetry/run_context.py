@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
 
 
 @dataclass(frozen=True, slots=True)
@@ -40,46 +45,93 @@ class RunContext:
     extra: Dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
-        d: Dict[str, Any] = {
-            "run_id": self.run_id,
-            "mode": self.mode,
-            "host_app": self.host_app,
-            "doc_id": self.doc_id,
-            "doc_key": self.doc_key,
-            "session_id": self.session_id,
-            "story_id": self.story_id,
-            "turn_id": self.turn_id,
-            "case_id": self.case_id,
-            "task_id": self.task_id,
-            "message_id": self.message_id,
-            "block_id": self.block_id,
-            "client_id": self.client_id,
-        }
+        values = _field_values(self)
+        try:
+            # Contexts repeat across every event of a turn; memoize the set fields on the values,
+            # so only those (typically 2-4) are copied out, with or without `extra`.
+            items = _compact_items(values)
+        except TypeError:
+            # Unhashable field value (direct construction with non-str): same filter, uncached.
+            items = _compact_items.__wrapped__(values)
+        d: Dict[str, Any] = dict(items)
         if self.extra:
             d["extra"] = dict(self.extra)
-        # Drop empty strings to keep payload compact.
-        return {k: v for k, v in d.items() if v not in ("", None, {}, [])}
+        return d
 
     @classmethod
     def from_any(cls, v: Any) -> "RunContext":
         if isinstance(v, RunContext):
             return v
         if isinstance(v, dict):
-            return cls(
-                run_id=str(v.get("run_id") or v.get("runId") or ""),
-                mode=str(v.get("mode") or ""),
-                host_app=str(v.get("host_app") or v.get("hostApp") or ""),
-                doc_id=str(v.get("doc_id") or v.get("docId") or ""),
-                doc_key=str(v.get("doc_key") or v.get("docKey") or ""),
-                session_id=str(v.get("session_id") or v.get("sessionId") or ""),
-                story_id=str(v.get("story_id") or v.get("storyId") or ""),
-                turn_id=str(v.get("turn_id") or v.get("turnId") or ""),
-                case_id=str(v.get("case_id") or v.get("caseId") or ""),
-                task_id=str(v.get("task_id") or v.get("taskId") or ""),
-                message_id=str(v.get("message_id") or v.get("messageId") or ""),
-                block_id=str(v.get("block_id") or v.get("blockId") or ""),
-                client_id=str(v.get("client_id") or v.get("clientId") or ""),
-                extra=dict(v.get("extra") or {}) if isinstance(v.get("extra"), dict) else {},
+            values = (
+                str(v.get("run_id") or v.get("runId") or ""),
+                str(v.get("mode") or ""),
+                str(v.get("host_app") or v.get("hostApp") or ""),
+                str(v.get("doc_id") or v.get("docId") or ""),
+                str(v.get("doc_key") or v.get("docKey") or ""),
+                str(v.get("session_id") or v.get("sessionId") or ""),
+                str(v.get("story_id") or v.get("storyId") or ""),
+                str(v.get("turn_id") or v.get("turnId") or ""),
+                str(v.get("case_id") or v.get("caseId") or ""),
+                str(v.get("task_id") or v.get("taskId") or ""),
+                str(v.get("message_id") or v.get("messageId") or ""),
+                str(v.get("block_id") or v.get("blockId") or ""),
+                str(v.get("client_id") or v.get("clientId") or ""),
             )
+            extra = v.get("extra")
+            if isinstance(extra, dict) and extra:
+                return cls(*values, extra=dict(extra))
+            if cls is RunContext:
+                return _shared_context(values)
+            return cls(*values)
         return cls()
 
+
+_FIELD_NAMES = (
+    "run_id",
+    "mode",
+    "host_app",
+    "doc_id",
+    "doc_key",
+    "session_id",
+    "story_id",
+    "turn_id",
+    "case_id",
+    "task_id",
+    "message_id",
+    "block_id",
+    "client_id",
+)
+_field_values = attrgetter(*_FIELD_NAMES)
+
+
+@lru_cache(maxsize=2048)
+def _compact_items(values: Tuple[Any, ...]) -> Tuple[Tuple[str, Any], ...]:
+    """Non-empty (name, value) pairs for a RunContext's label fields, in declaration order."""
+    return tuple((k, v) for k, v in zip(_FIELD_NAMES, values) if v not in ("", None, {}, []))
+
+
+# Flyweight cache: callers pass the same context dict for every event of a turn.
+_RC_CACHE: "OrderedDict[Tuple[str, ...], RunContext]" = OrderedDict()
+_RC_CACHE_MAX = 512
+_RC_CACHE_LOCK = threading.Lock()
+_NO_EXTRA: "MappingProxyType[str, Any]" = MappingProxyType({})
+
+
+def _shared_context(values: Tuple[str, ...]) -> RunContext:
+    """Return the cached extra-less RunContext for these label values (LRU).
+
+    Instances are handed to many callers, so `extra` is a read-only empty mapping rather
+    than a dict one caller could fill in for everyone else.
+    """
+    with _RC_CACHE_LOCK:
+        rc = _RC_CACHE.get(values)
+        if rc is not None:
+            _RC_CACHE.move_to_end(values)
+            return rc
+    rc = RunContext(*values, extra=_NO_EXTRA)  # type: ignore[arg-type]
+    with _RC_CACHE_LOCK:
+        _RC_CACHE[values] = rc
+        if len(_RC_CACHE) > _RC_CACHE_MAX:
+            _RC_CACHE.popitem(last=False)
+    return rc
@@ -3,12 +3,15 @@ from __future__ import annotations
 import json
 import logging
 import os
+import queue
 import threading
 import time
 from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Deque, Dict, Iterable, List, Optional, Protocol
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
 
 from ah32.telemetry.run_context import RunContext
 
@@ -35,6 +38,29 @@ class TelemetryCapabilities:
         }
 
 
+_SCHEMA_VERSION = "ah32.telemetry.v1"
+
+
+@dataclass(slots=True)
+class TelemetryEvent:
+    """Queued event. RunContext stays unflattened until the flusher hands the batch to sinks."""
+
+    schema_version: str
+    event_name: str
+    ts: float
+    context: RunContext
+    payload: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "schema_version": self.schema_version,
+            "event_name": self.event_name,
+            "ts": self.ts,
+            **self.context.to_dict(),
+            "payload": self.payload,
+        }
+
+
 class TelemetrySink(Protocol):
     name: str
 
@@ -42,8 +68,75 @@ class TelemetrySink(Protocol):
     def close(self) -> None: ...
 
 
+# Batches a background sink may have in flight before new ones are dropped.
+_SINK_QUEUE_BATCHES = 64
+
+
+class _SinkWorker:
+    """Run a slow sink on its own thread behind a bounded queue (drop-newest when full).
+
+    Implements the TelemetrySink protocol, so the flusher hands it batches like any other sink;
+    a stalled remote endpoint then only backs up this queue instead of the flusher.
+    """
+
+    _STOP = object()
+
+    def __init__(self, sink: TelemetrySink, *, max_batches: int = _SINK_QUEUE_BATCHES) -> None:
+        self.sink = sink
+        self.name = str(getattr(sink, "name", "unknown"))
+        self.dropped = 0
+        self._q: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(max_batches)))
+        self._thread = threading.Thread(
+            target=self._run, name=f"telemetry-sink-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def write_many(self, events: List[Dict[str, Any]]) -> None:
+        try:
+            self._q.put_nowait(events)
+        except queue.Full:
+            self.dropped += len(events)
+            logger.warning(
+                "[telemetry] sink %s backlog full, dropped %d events", self.name, len(events)
+            )
+
+    def close(self, *, timeout_s: float = 2.0) -> None:
+        timeout = max(0.1, float(timeout_s))
+        try:
+            # The worker closes the sink itself after the stop marker, never under a live write.
+            self._q.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("[telemetry] sink %s still busy on close, abandoning backlog", self.name)
+            return
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            logger.warning(
+                "[telemetry] sink %s still writing on close; closes once done", self.name
+            )
+
+    def _run(self) -> None:
+        while True:
+            events = self._q.get()
+            if events is self._STOP:
+                break
+            try:
+                self.sink.write_many(events)
+            except Exception as e:
+                logger.error(
+                    "[telemetry] sink write failed: %s err=%s", self.name, e, exc_info=True
+                )
+        try:
+            self.sink.close()
+        except Exception as e:
+            logger.error("[telemetry] sink close failed: %s err=%s", self.name, e, exc_info=True)
+
+
+@lru_cache(maxsize=None)
 def _env_first(name: str) -> str:
-    """Return unprefixed env var first, then AH32_-prefixed."""
+    """Return unprefixed env var first, then AH32_-prefixed.
+
+    Snapshotted per name on first read; call `_env_first.cache_clear()` after changing os.environ.
+    """
     v = (os.getenv(name) or "").strip()
     if v:
         return v
@@ -58,6 +151,24 @@ def _normalize_mode(v: str) -> str:
     return "local"
 
 
+# (constructor arg, env override, Settings attribute, default, coercion)
+_SETTINGS_SCHEMA: Tuple[Tuple[str, str, str, Any, Callable[[Any], Any]], ...] = (
+    ("mode", "TELEMETRY_MODE", "telemetry_mode", "local", str),
+    (
+        "sqlite_path",
+        "TELEMETRY_SQLITE_PATH",
+        "telemetry_sqlite_path",
+        "storage/telemetry/telemetry.sqlite3",
+        Path,
+    ),
+    ("retention_days", "TELEMETRY_RETENTION_DAYS", "telemetry_retention_days", 7, int),
+    ("flush_interval_ms", "TELEMETRY_FLUSH_INTERVAL_MS", "telemetry_flush_interval_ms", 250, int),
+    ("batch_size", "TELEMETRY_BATCH_SIZE", "telemetry_batch_size", 200, int),
+    ("remote_endpoint", "TELEMETRY_REMOTE_ENDPOINT", "telemetry_remote_endpoint", "", str),
+    ("max_queue_size", "TELEMETRY_MAX_QUEUE_SIZE", "telemetry_max_queue_size", 50_000, int),
+)
+
+
 class TelemetryService:
     """In-process telemetry queue + background flusher (SQLite and/or remote forward)."""
 
@@ -67,9 +178,10 @@ class TelemetryService:
         mode: str,
         sqlite_path: Path,
         retention_days: int = 7,
-        flush_interval_ms: int = 1000,
+        flush_interval_ms: int = 250,
         batch_size: int = 200,
         remote_endpoint: str = "",
+        max_queue_size: int = 50_000,
     ) -> None:
         self._mode = _normalize_mode(mode)
         self._sqlite_path = Path(sqlite_path)
@@ -77,10 +189,19 @@ class TelemetryService:
         self._flush_interval_ms = max(50, int(flush_interval_ms))
         self._batch_size = max(1, int(batch_size))
         self._remote_endpoint = str(remote_endpoint or "").strip()
-
-        self._queue: Deque[Dict[str, Any]] = deque()
-        self._lock = threading.Lock()
+        self._max_queue_size = max(1, int(max_queue_size))
+
+        # deque.append/popleft/extend are atomic under the GIL, so producers and the
+        # flusher share the queue without an external lock.
+        self._queue: Deque[TelemetryEvent] = deque()
+        # Events refused because the queue was full (drop-newest); only the drop path locks.
+        self._dropped = 0
+        self._dropped_reported = 0
+        self._drop_lock = threading.Lock()
         self._stop = threading.Event()
+        # Set by producers once a full batch is queued so the flusher need not wait out
+        # the interval.
+        self._wake = threading.Event()
         self._thread: Optional[threading.Thread] = None
 
         self._sinks: List[TelemetrySink] = []
@@ -91,23 +212,11 @@ class TelemetryService:
     @classmethod
     def from_settings(cls, settings: Any) -> "TelemetryService":
         # Allow unprefixed env overrides to keep private deployments simple.
-        mode = _env_first("TELEMETRY_MODE") or getattr(settings, "telemetry_mode", "local")
-        sqlite_path = _env_first("TELEMETRY_SQLITE_PATH") or str(getattr(settings, "telemetry_sqlite_path", ""))
-        retention_days = _env_first("TELEMETRY_RETENTION_DAYS") or str(getattr(settings, "telemetry_retention_days", 7))
-        flush_interval_ms = _env_first("TELEMETRY_FLUSH_INTERVAL_MS") or str(
-            getattr(settings, "telemetry_flush_interval_ms", 1000)
-        )
-        batch_size = _env_first("TELEMETRY_BATCH_SIZE") or str(getattr(settings, "telemetry_batch_size", 200))
-        remote_endpoint = _env_first("TELEMETRY_REMOTE_ENDPOINT") or str(getattr(settings, "telemetry_remote_endpoint", ""))
-
-        return cls(
-            mode=str(mode or "local"),
-            sqlite_path=Path(sqlite_path) if sqlite_path else Path("storage/telemetry/telemetry.sqlite3"),
-            retention_days=int(retention_days or 7),
-            flush_interval_ms=int(flush_interval_ms or 1000),
-            batch_size=int(batch_size or 200),
-            remote_endpoint=str(remote_endpoint or ""),
-        )
+        kwargs: Dict[str, Any] = {}
+        for arg, env_name, attr, default, coerce in _SETTINGS_SCHEMA:
+            raw = _env_first(env_name) or str(getattr(settings, attr, default))
+            kwargs[arg] = coerce(raw or default)
+        return cls(**kwargs)
 
     def _init_sinks(self) -> None:
         mode = self._mode
@@ -136,7 +245,8 @@ class TelemetryService:
                 try:
                     from ah32._internal.telemetry_sinks.remote_sink import HttpForwardTelemetrySink
 
-                    self._sinks.append(HttpForwardTelemetrySink(endpoint=self._remote_endpoint))
+                    # Network I/O gets its own worker so a slow endpoint never delays SQLite.
+                    self._sinks.append(_SinkWorker(HttpForwardTelemetrySink(endpoint=self._remote_endpoint)))
                     logger.info("[telemetry] remote sink enabled endpoint=%s", self._remote_endpoint)
                 except Exception as e:
                     logger.error("[telemetry] remote sink init failed: %s", e, exc_info=True)
@@ -163,6 +273,7 @@ class TelemetryService:
     def stop(self, *, timeout_s: float = 2.0) -> None:
         try:
             self._stop.set()
+            self._wake.set()
             t = self._thread
             if t and t.is_alive():
                 t.join(timeout=max(0.1, float(timeout_s)))
@@ -187,61 +298,124 @@ class TelemetryService:
             return
         try:
             rc = RunContext.from_any(ctx)
-            ev: Dict[str, Any] = {
-                "schema_version": "ah32.telemetry.v1",
-                "event_name": name,
-                "ts": time.time(),
-                **rc.to_dict(),
-                "payload": dict(payload or {}),
-            }
-            with self._lock:
-                self._queue.append(ev)
+            event = TelemetryEvent(_SCHEMA_VERSION, name, time.time(), rc, dict(payload or {}))
+            self._enqueue(event)
         except Exception:
             logger.error("[telemetry] emit failed: %s", event_name, exc_info=True)
 
+    def emit_span(
+        self,
+        event_name: str,
+        t_start: float,
+        t_end: float,
+        payload: Dict[str, Any] | None = None,
+        *,
+        ctx: Any = None,
+    ) -> None:
+        """Emit one event for a whole operation instead of a start/end pair.
+
+        `t_start`/`t_end` are wall-clock seconds (time.time()); the event is stamped at `t_start`
+        and its payload gains `duration_ms` and `phase="span"`.
+        """
+        if self._mode == "off":
+            return
+        name = str(event_name or "").strip()
+        if not name:
+            return
+        try:
+            data = dict(payload or {})
+            data["duration_ms"] = round((float(t_end) - float(t_start)) * 1000.0, 3)
+            data["phase"] = "span"
+            rc = RunContext.from_any(ctx)
+            self._enqueue(TelemetryEvent(_SCHEMA_VERSION, name, float(t_start), rc, data))
+        except Exception:
+            logger.error("[telemetry] emit_span failed: %s", event_name, exc_info=True)
+
+    def emit_many(
+        self,
+        items: Iterable[Tuple[str, Dict[str, Any] | None]],
+        *,
+        ctx: Any = None,
+    ) -> int:
+        """Enqueue `(event_name, payload)` pairs sharing one context; returns the count queued.
+
+        Preferred over calling emit() in a hot loop: the context is resolved and the
+        clock read once, and the queue is extended in a single step.
+        """
+        if self._mode == "off":
+            return 0
+        batch: List[TelemetryEvent] = []
+        try:
+            rc = RunContext.from_any(ctx)
+            now = time.time()
+            for event_name, payload in items:
+                name = str(event_name or "").strip()
+                if name:
+                    event = TelemetryEvent(_SCHEMA_VERSION, name, now, rc, dict(payload or {}))
+                    batch.append(event)
+        except Exception:
+            logger.error("[telemetry] emit_many failed", exc_info=True)
+        return self._enqueue_many(batch)
+
+    @contextmanager
+    def span(self, event_name: str, *, ctx: Any = None) -> Iterator[Dict[str, Any]]:
+        """Time a block and emit it as one span event; the yielded dict becomes the payload.
+
+        Exceptions propagate; the span is still emitted with `error` set to the exception type.
+        """
+        payload: Dict[str, Any] = {}
+        wall_start = time.time()
+        perf_start = time.perf_counter()
+        try:
+            yield payload
+        except BaseException as e:
+            payload["error"] = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - perf_start
+            self.emit_span(event_name, wall_start, wall_start + elapsed, payload, ctx=ctx)
+
     def ingest(self, events: Iterable[Dict[str, Any]]) -> int:
         """Accept client-reported events. Best-effort validation + enqueue."""
         if self._mode == "off":
             return 0
-        accepted = 0
+        # Normalize into a local list first (no shared state touched while parsing),
+        # then enqueue in one pass.
+        batch: List[TelemetryEvent] = []
         try:
             now = time.time()
-            with self._lock:
-                for raw in events:
-                    if not isinstance(raw, dict):
-                        continue
-                    name = str(raw.get("event_name") or raw.get("event") or raw.get("name") or "").strip()
-                    if not name:
-                        continue
-                    ts = raw.get("ts")
-                    try:
-                        ts_f = float(ts) if ts is not None else now
-                    except Exception:
-                        ts_f = now
-
-                    # Normalize fields to our canonical names.
-                    rc = RunContext.from_any(raw)
-                    payload = raw.get("payload") if isinstance(raw.get("payload"), dict) else {}
-                    ev: Dict[str, Any] = {
-                        "schema_version": str(raw.get("schema_version") or "ah32.telemetry.v1"),
-                        "event_name": name,
-                        "ts": ts_f,
-                        **rc.to_dict(),
-                        "payload": dict(payload),
-                    }
-                    self._queue.append(ev)
-                    accepted += 1
+            for raw in events:
+                if not isinstance(raw, dict):
+                    continue
+                name = raw.get("event_name") or raw.get("event") or raw.get("name") or ""
+                name = str(name).strip()
+                if not name:
+                    continue
+                ts = raw.get("ts")
+                try:
+                    ts_f = float(ts) if ts is not None else now
+                except Exception:
+                    ts_f = now
+
+                # Normalize fields to our canonical names.
+                payload = raw.get("payload") if isinstance(raw.get("payload"), dict) else {}
+                batch.append(
+                    TelemetryEvent(
+                        str(raw.get("schema_version") or _SCHEMA_VERSION),
+                        name,
+                        ts_f,
+                        RunContext.from_any(raw),
+                        dict(payload),
+                    )
+                )
         except Exception:
             logger.error("[telemetry] ingest failed", exc_info=True)
-        return accepted
+        return self._enqueue_many(batch)
 
     def flush_now(self) -> int:
         if self._mode == "off":
             return 0
-        batch: List[Dict[str, Any]] = []
-        with self._lock:
-            while self._queue:
-                batch.append(self._queue.popleft())
+        batch = self._drain()
         if not batch:
             return 0
         self._write_to_sinks(batch)
@@ -283,13 +457,14 @@ class TelemetryService:
         last_cleanup = 0.0
         while not self._stop.is_set():
             try:
-                time.sleep(self._flush_interval_ms / 1000.0)
-                batch: List[Dict[str, Any]] = []
-                with self._lock:
-                    while self._queue and len(batch) < self._batch_size:
-                        batch.append(self._queue.popleft())
+                self._wake.wait(timeout=self._flush_interval_ms / 1000.0)
+                self._wake.clear()
+                batch = self._drain(self._batch_size)
                 if batch:
                     self._write_to_sinks(batch)
+                if len(self._queue) >= self._batch_size:
+                    # Still a full batch behind: go again without waiting.
+                    self._wake.set()
 
                 # Periodic retention cleanup (once/min).
                 if self._sqlite_sink and (time.time() - last_cleanup) > 60:
@@ -301,14 +476,77 @@ class TelemetryService:
             except Exception:
                 logger.error("[telemetry] flush loop crashed", exc_info=True)
 
-    def _write_to_sinks(self, batch: List[Dict[str, Any]]) -> None:
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "max_queue_size": self._max_queue_size,
+            "dropped": self._dropped,
+            "sink_dropped": {s.name: s.dropped for s in self._sinks if isinstance(s, _SinkWorker)},
+        }
+
+    def _enqueue(self, ev: TelemetryEvent) -> None:
+        if len(self._queue) >= self._max_queue_size:
+            self._count_dropped(1)
+            return
+        self._queue.append(ev)
+        if len(self._queue) >= self._batch_size:
+            self._wake.set()
+
+    def _enqueue_many(self, batch: List[TelemetryEvent]) -> int:
+        room = max(0, self._max_queue_size - len(self._queue))
+        if len(batch) > room:
+            self._count_dropped(len(batch) - room)
+            del batch[room:]
+        self._queue.extend(batch)
+        if len(self._queue) >= self._batch_size:
+            self._wake.set()
+        return len(batch)
+
+    def _count_dropped(self, n: int) -> None:
+        with self._drop_lock:
+            self._dropped += n
+
+    def _dropped_event(self) -> Optional[TelemetryEvent]:
+        """Summarize drops since the last flush as one synthetic event (None if nothing new)."""
+        with self._drop_lock:
+            total = self._dropped
+            new = total - self._dropped_reported
+            self._dropped_reported = total
+        if new <= 0:
+            return None
+        logger.warning("[telemetry] queue full, dropped %d events (total=%d)", new, total)
+        return TelemetryEvent(
+            _SCHEMA_VERSION,
+            "telemetry.dropped",
+            time.time(),
+            RunContext(),
+            {"dropped": new, "total_dropped": total, "max_queue_size": self._max_queue_size},
+        )
+
+    def _drain(self, limit: Optional[int] = None) -> List[TelemetryEvent]:
+        """Pop up to `limit` queued events (all when None) in FIFO order, plus any drop summary."""
+        batch: List[TelemetryEvent] = []
+        dropped = self._dropped_event()
+        if dropped is not None:
+            batch.append(dropped)
+        popleft = self._queue.popleft
+        while limit is None or len(batch) < limit:
+            try:
+                batch.append(popleft())
+            except IndexError:
+                break
+        return batch
+
+    def _write_to_sinks(self, batch: List[TelemetryEvent]) -> None:
         if not batch:
             return
         if not self._sinks:
             return
+        # Flatten once per batch; every sink shares the same dicts.
+        events = [ev.to_dict() for ev in batch]
         for s in list(self._sinks):
             try:
-                s.write_many(batch)
+                s.write_many(events)
             except Exception as e:
                 logger.error("[telemetry] sink write failed: %s err=%s", getattr(s, "name", "unknown"), e, exc_info=True)
 
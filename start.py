@@ -4,28 +4,85 @@ Ah32 启动脚本 - 独立模式
 """
 from __future__ import annotations
 
-import subprocess
+import atexit
+import codecs
 import sys
 import os
 import getopt
+import io
+import queue
+import re
+import selectors
+import select
 import threading
 import time
 import signal
-from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 import socket
+import struct
+
+# subprocess/ctypes are imported where used, so --status/--stop/--tail don't pay for them.
+# (Same for `typing`: type checkers treat this module-level flag like typing.TYPE_CHECKING.)
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import subprocess
+
+try:
+    import fcntl
+except ImportError:  # Windows: pidfiles are not locked; liveness falls back to os.kill(pid, 0)
+    fcntl = None
+
+
+_ENV_LINE_RE = re.compile(r"^(?:export\s+)?([^=\s]+)\s*(?:=\s*(.*))?$")
+_ENV_QUOTED_RE = {
+    "'": re.compile(r"'((?:[^'\\]|\\.)*)'\s*(?:#.*)?$"),
+    '"': re.compile(r'"((?:[^"\\]|\\.)*)"\s*(?:#.*)?$'),
+}
+_ENV_ESCAPES_RE = {"'": re.compile(r"\\[\\']"), '"': re.compile(r"\\[\\'\"abfnrtv]")}
+_ENV_VAR_RE = re.compile(r"\$\{([^}:]+)(?::-([^}]*))?\}")
+
+
+def _parse_env_value(value: str, where: str) -> str:
+    """Decode one .env value like python-dotenv: quotes, escapes, trailing comments, ${VAR}."""
+    quote = value[:1]
+    if quote not in _ENV_QUOTED_RE:
+        value = re.split(r"\s+#", value, maxsplit=1)[0].rstrip()
+    else:
+        m = _ENV_QUOTED_RE[quote].match(value)
+        if m is None:
+            # Multi-line or otherwise unterminated quotes: refuse rather than keep the raw text.
+            raise RuntimeError(f"{where}: unsupported .env value {value!r}")
+        value = _ENV_ESCAPES_RE[quote].sub(
+            lambda e: codecs.decode(e.group(0), "unicode-escape"), m.group(1)
+        )
+    return _ENV_VAR_RE.sub(lambda v: os.environ.get(v.group(1), v.group(2) or ""), value)
+
+
+def _load_env_file(path: Path) -> None:
+    """Minimal .env loader (override=True) covering the python-dotenv syntax this repo uses.
+
+    Parsed inline so status/stop/tail don't pay the python-dotenv import; the backend
+    re-reads the same .env through python-dotenv itself.
+    """
+    lines = path.read_text(encoding="utf-8-sig").splitlines()
+    for lineno, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        m = _ENV_LINE_RE.match(line)
+        if m is None:
+            raise RuntimeError(f"{path}:{lineno}: unsupported .env line {raw!r}")
+        if m.group(2) is not None:  # a bare `KEY` line sets nothing, as in python-dotenv
+            os.environ[m.group(1)] = _parse_env_value(m.group(2), f"{path}:{lineno}")
+
 
 # Load .env file (strict: must exist and include AH32_EMBEDDING_MODEL)
-try:
-    from dotenv import load_dotenv
-except ImportError as e:
-    raise RuntimeError("python-dotenv is required to load .env; please install it.") from e
-
 env_file = Path(__file__).parent / ".env"
 if not env_file.exists():
     raise RuntimeError(f".env file not found: {env_file}. Create it in the repo root.")
 
-load_dotenv(env_file, override=True)
+_load_env_file(env_file)
 if not os.environ.get("AH32_EMBEDDING_MODEL"):
     raise RuntimeError("AH32_EMBEDDING_MODEL is missing in .env; please configure it.")
 
@@ -40,6 +97,7 @@ LOG_DIR = Path("logs")
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
 # Allow overriding where this script writes pid/daemon logs.
+# Both dirs are created once here; the pid/log writers below assume they exist.
 RUN_DIR = Path(os.environ.get("AH32_RUN_DIR") or str(LOG_DIR))
 RUN_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -56,74 +114,178 @@ BACKEND_PID_FILE = RUN_DIR / "backend.pid"
 BACKEND_DAEMON_LOG = RUN_DIR / "backend.nohup.log"
 
 
+def _now() -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
 def _port_open(host: str, port: int) -> bool:
+    if not _IS_WINDOWS:
+        try:
+            # Ask the kernel for a LISTEN socket instead of handshaking with the backend.
+            return bool(_netlink_listening_inodes(port, host))
+        except OSError:
+            pass  # sock_diag unavailable; fall back to a connect probe below
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             s.settimeout(0.3)
+            # Reset on close instead of a FIN/ACK teardown the backend has to service.
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
             return s.connect_ex((host, port)) == 0
     except Exception:
         return False
 
 
-def _pid_cmdline(pid: int) -> str:
+def _pid_cmdline(pid: int) -> bytes:
+    """Raw NUL-delimited /proc/<pid>/cmdline (b"" if unavailable)."""
     if _IS_WINDOWS:
-        return ""
+        return b""
     try:
-        raw = Path(f"/proc/{pid}/cmdline").read_bytes()
-        # cmdline is NUL-delimited
-        return raw.replace(b"\x00", b" ").decode("utf-8", errors="replace").strip()
-    except Exception:
-        return ""
+        # /proc/<pid> ctime changes when the PID is reused, so stale cache entries never match.
+        stamp = os.stat(f"/proc/{pid}").st_ctime_ns
+    except OSError:
+        return b""
+    return _read_cmdline(pid, stamp)
+
+
+@lru_cache(maxsize=64)
+def _read_cmdline(pid: int, stamp: int) -> bytes:
+    try:
+        fd = os.open(f"/proc/{pid}/cmdline", os.O_RDONLY)
+    except OSError:
+        return b""
+    try:
+        return os.read(fd, 4096)
+    except OSError:
+        return b""
+    finally:
+        os.close(fd)
 
 
 def _looks_like_ah32_backend(pid: int) -> bool:
-    cmd = _pid_cmdline(pid)
-    if not cmd:
-        return False
-    return (
-        "ah32.server.main" in cmd
-        or "uvicorn" in cmd and "ah32.server.main:app" in cmd
-        or "ah32.server.main:app" in cmd
-    )
+    # Covers both `python -m ah32.server.main` and `uvicorn ah32.server.main:app`.
+    return b"ah32.server.main" in _pid_cmdline(pid)
+
+
+# NETLINK_SOCK_DIAG (linux/sock_diag.h, linux/inet_diag.h)
+_NETLINK_SOCK_DIAG = 4
+_SOCK_DIAG_BY_FAMILY = 20
+_NLM_F_REQUEST_DUMP = 0x301
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_TCP_LISTEN = 10
+# nlmsghdr is 16 bytes; inet_diag_msg: sport at +4 (big-endian), src address at +8
+# (16 bytes, IPv4 uses the first 4), idiag_inode at +68.
+_NLMSG_HDR_LEN = 16
+_DIAG_SPORT_OFFSET = 4
+_DIAG_SRC_OFFSET = 8
+_DIAG_INODE_OFFSET = 68
+
+
+def _diag_bind_addrs(host: str) -> dict[int, tuple[bytes, ...]]:
+    """Per family, the bound addresses whose listener accepts a connect to IPv4 <host>."""
+    ip = socket.inet_aton(socket.gethostbyname(host))
+    return {
+        socket.AF_INET: (ip, bytes(4)),
+        socket.AF_INET6: (bytes(10) + b"\xff\xff" + ip, bytes(16)),
+    }
+
+
+def _diag_listen_inodes(
+    nl: socket.socket, port: int, addrs: tuple[bytes, ...] | None = None
+) -> set[int]:
+    """Read one sock_diag dump reply; return inodes of sockets bound to <port> (and <addrs>)."""
+    inodes: set[int] = set()
+    while True:
+        data = nl.recv(65536)
+        if not data:
+            return inodes
+        offset = 0
+        while offset + _NLMSG_HDR_LEN <= len(data):
+            length, msg_type = struct.unpack_from("=IH", data, offset)
+            if msg_type == _NLMSG_DONE:
+                return inodes
+            body = offset + _NLMSG_HDR_LEN
+            if msg_type == _NLMSG_ERROR:
+                err = -struct.unpack_from("=i", data, body)[0]
+                raise OSError(err, os.strerror(err))
+            src = body + _DIAG_SRC_OFFSET
+            if struct.unpack_from("!H", data, body + _DIAG_SPORT_OFFSET)[0] == port and (
+                addrs is None or data[src:src + len(addrs[0])] in addrs
+            ):
+                inodes.add(struct.unpack_from("=I", data, body + _DIAG_INODE_OFFSET)[0])
+            offset += max(_NLMSG_HDR_LEN, (length + 3) & ~3)
+
+
+def _netlink_listening_inodes(port: int, host: str | None = None) -> set[int]:
+    """Socket inodes in TCP LISTEN on <port> (IPv4 + IPv6), asked directly from the kernel.
+
+    With <host>, only listeners a connect to <host>:<port> would reach (its address or wildcard).
+    """
+    addrs = _diag_bind_addrs(host) if host else {}
+    inodes: set[int] = set()
+    for family in (socket.AF_INET, socket.AF_INET6):
+        with socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, _NETLINK_SOCK_DIAG) as nl:
+            # inet_diag_req_v2: family, protocol, ext, pad, states, zeroed sockid (48 bytes)
+            req = struct.pack("=BBBBI48x", family, socket.IPPROTO_TCP, 0, 0, 1 << _TCP_LISTEN)
+            hdr = struct.pack(
+                "=IHHII", _NLMSG_HDR_LEN + len(req), _SOCK_DIAG_BY_FAMILY, _NLM_F_REQUEST_DUMP, 1, 0
+            )
+            nl.sendall(hdr + req)
+            inodes |= _diag_listen_inodes(nl, port, addrs.get(family))
+    return inodes
+
+
+def _pids_owning_inodes(inodes: set[int]) -> set[int]:
+    """Map socket inodes to owning PIDs via /proc/<pid>/fd (only processes we may inspect)."""
+    targets = {f"socket:[{inode}]" for inode in inodes}
+    pids: set[int] = set()
+    for proc in os.scandir("/proc"):
+        if not proc.name.isdigit():
+            continue
+        try:
+            for fd in os.scandir(f"/proc/{proc.name}/fd"):
+                if os.readlink(fd.path) in targets:
+                    pids.add(int(proc.name))
+                    break
+        except OSError:
+            continue
+    return pids
 
 
-def _find_listening_pids(port: int) -> list[int]:
-    """Best-effort: return PIDs listening on 127.0.0.1:<port>."""
-    if _IS_WINDOWS:
-        return []
+# Example: users:(("python",pid=99943,fd=21))
+_SS_PID_RE = re.compile(rb"pid=(\d+)")
+
+
+def _ss_listening_pids(port: int) -> list[int]:
+    """Fallback for _find_listening_pids: scan `ss -Hltnp` output (raw bytes, one regex pass)."""
+    import subprocess
+
     try:
-        result = subprocess.run(
-            ["ss", "-ltnp"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=False,
-        )
-        out = result.stdout or ""
+        result = subprocess.run(["ss", "-Hltnp"], capture_output=True, check=False)
+        out = result.stdout or b""
     except Exception:
         return []
 
     pids: set[int] = set()
-    for line in out.splitlines():
-        if f":{port} " not in line and f":{port}\n" not in line and f":{port}\t" not in line:
-            continue
-        # Example: users:(("python",pid=99943,fd=21))
-        for token in line.split("pid=")[1:]:
-            num = ""
-            for ch in token:
-                if ch.isdigit():
-                    num += ch
-                else:
-                    break
-            if num:
-                try:
-                    pids.add(int(num))
-                except Exception:
-                    pass
+    for m in re.finditer(rb"^[^\n]*:%d\s[^\n]*" % port, out, re.M):
+        pids.update(int(pid) for pid in _SS_PID_RE.findall(m.group(0)))
     return sorted(pids)
 
 
+def _find_listening_pids(port: int) -> list[int]:
+    """Best-effort: return PIDs listening on 127.0.0.1:<port>."""
+    if _IS_WINDOWS:
+        return []
+    try:
+        inodes = _netlink_listening_inodes(port)
+    except OSError:
+        # sock_diag unavailable (EPERM in locked-down containers, old kernels): use ss.
+        return _ss_listening_pids(port)
+    if not inodes:
+        return []
+    return sorted(_pids_owning_inodes(inodes))
+
+
 def _pid_is_running(pid: int) -> bool:
     if pid <= 0:
         return False
@@ -138,6 +300,23 @@ def _pid_is_running(pid: int) -> bool:
         return False
 
 
+def _wait_pid_exit(pid: int, timeout_s: float) -> bool | None:
+    """Block until <pid> exits (True) or the timeout passes (False); None without pidfd."""
+    try:
+        fd = os.pidfd_open(pid)
+    except ProcessLookupError:
+        return True
+    except (AttributeError, OSError):
+        # Windows / kernels before 5.3: caller keeps the sleep-poll loop.
+        return None
+    try:
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        return bool(poller.poll(max(0, int(timeout_s * 1000))))
+    finally:
+        os.close(fd)
+
+
 def _read_pidfile(pid_file: Path) -> int | None:
     try:
         raw = pid_file.read_text(encoding="utf-8").strip()
@@ -154,12 +333,57 @@ def _read_any_pidfile() -> tuple[int | None, Path | None]:
     for p in (BACKEND_PID_FILE, LEGACY_RUN_DIR / "backend.pid"):
         pid = _read_pidfile(p)
         if pid:
+            # The daemon holds an flock on the current pidfile for its lifetime; if nobody
+            # does, the pid is stale (and may since have been reused by another process).
+            if p == BACKEND_PID_FILE and not _pidfile_held(p) and not _is_unlocked_backend(pid):
+                continue
             return pid, p
     return None, None
 
 
-def _write_pidfile(pid_file: Path, pid: int) -> None:
-    pid_file.parent.mkdir(parents=True, exist_ok=True)
+def _is_unlocked_backend(pid: int) -> bool:
+    """Backends started before the pidfile flock never take it; trust a live ah32 backend pid."""
+    return _pid_is_running(pid) and _looks_like_ah32_backend(pid)
+
+
+def _pidfile_held(pid_file: Path) -> bool:
+    """True if a live process holds the pidfile lock (always True where flock is unavailable)."""
+    if fcntl is None:
+        return True
+    try:
+        fd = os.open(pid_file, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        return False
+    except OSError:
+        return True
+    finally:
+        os.close(fd)
+
+
+def _claim_pidfile(pid_file: Path) -> int | None:
+    """Open <pid_file> under an exclusive flock, to be inherited by the daemon (None without flock).
+
+    Raises BlockingIOError if a running instance already holds it.
+    """
+    if fcntl is None:
+        return None
+    fd = os.open(pid_file, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _write_pidfile(pid_file: Path, pid: int, fd: int | None = None) -> None:
+    if fd is not None:
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, f"{pid}\n".encode("utf-8"), 0)
+        return
     pid_file.write_text(f"{pid}\n", encoding="utf-8")
 
 
@@ -171,6 +395,12 @@ def _remove_pidfile(pid_file: Path) -> None:
 
 
 def _make_backend_env() -> dict:
+    return dict(_backend_env())
+
+
+@lru_cache(maxsize=1)
+def _backend_env() -> dict:
+    """Backend subprocess env, built once (.env is loaded at import); callers get copies."""
     env = os.environ.copy()
     env["PYTHONPATH"] = str(Path.cwd() / "src")
     env["PYTHONWARNINGS"] = "ignore::DeprecationWarning"
@@ -196,30 +426,45 @@ def _make_backend_env() -> dict:
     return env
 
 
+def _last_lines(path: Path, n: int, chunk: int = 8192) -> list[str]:
+    """Last <n> lines of <path>, read backwards from the end (cost ~ n lines, not the file size)."""
+    if n <= 0:
+        return []
+    chunks: list[bytes] = []
+    newlines = 0
+    with path.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        while pos > 0 and newlines <= n:
+            step = min(chunk, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step)
+            chunks.append(data)
+            newlines += data.count(b"\n")
+    text = b"".join(reversed(chunks)).decode("utf-8", errors="replace")
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    if pos > 0:
+        lines = lines[1:]  # starts mid-line
+    return lines[-n:]
+
+
 def _tail_file(path: Path, last_n: int = 200) -> int:
     if not path.exists():
         print(f"[ERROR] Log file not found: {path}")
         return 1
 
     try:
-        with path.open("r", encoding="utf-8", errors="replace") as f:
-            lines = f.readlines()
-            for line in lines[-last_n:]:
-                print(line.rstrip("\n"))
+        for line in _last_lines(path, last_n):
+            print(line)
     except Exception as e:
         print(f"[ERROR] Failed to read log file: {e}")
         return 1
 
     print(f"\n[INFO] Tailing: {path} (Ctrl+C to exit)")
     try:
-        with path.open("r", encoding="utf-8", errors="replace") as f:
-            f.seek(0, os.SEEK_END)
-            while True:
-                line = f.readline()
-                if not line:
-                    time.sleep(0.2)
-                    continue
-                print(line.rstrip("\n"))
+        _follow_file(path)
     except KeyboardInterrupt:
         return 0
     except Exception as e:
@@ -227,11 +472,83 @@ def _tail_file(path: Path, last_n: int = 200) -> int:
         return 1
 
 
+# inotify(7) masks
+_IN_MODIFY = 0x002
+_IN_MOVE_SELF = 0x800
+_IN_DELETE_SELF = 0x400
+_IN_IGNORED = 0x8000
+_IN_ROTATED = _IN_MOVE_SELF | _IN_DELETE_SELF | _IN_IGNORED
+
+
+def _inotify_watch(path: Path) -> int | None:
+    """inotify fd watching <path> for appends/rotation; None where unsupported (caller polls)."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        mask = _IN_MODIFY | _IN_MOVE_SELF | _IN_DELETE_SELF
+        if libc.inotify_add_watch(fd, os.fsencode(str(path)), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (ImportError, OSError, AttributeError):
+        return None
+
+
+def _inotify_wait(fd: int) -> bool:
+    """Block until the watched file changes; True if it was moved/deleted (log rotation)."""
+    data = os.read(fd, 4096)
+    rotated = False
+    offset = 0
+    # struct inotify_event { int wd; uint32 mask; uint32 cookie; uint32 len; char name[len]; }
+    while offset + 16 <= len(data):
+        _wd, mask, _cookie, name_len = struct.unpack_from("=iIII", data, offset)
+        rotated = rotated or bool(mask & _IN_ROTATED)
+        offset += 16 + name_len
+    return rotated
+
+
+def _follow_file(path: Path) -> None:
+    """Print lines appended to <path> until interrupted; reopens the file after rotation."""
+    f = path.open("r", encoding="utf-8", errors="replace")
+    f.seek(0, os.SEEK_END)
+    watch = _inotify_watch(path)
+    try:
+        while True:
+            line = f.readline()
+            if line:
+                print(line.rstrip("\n"))
+                continue
+            if watch is None:
+                time.sleep(0.2)
+                continue
+            if not _inotify_wait(watch):
+                continue
+            for line in f:
+                print(line.rstrip("\n"))
+            os.close(watch)
+            watch = None
+            f.close()
+            while not path.exists():
+                time.sleep(0.2)
+            f = path.open("r", encoding="utf-8", errors="replace")
+            watch = _inotify_watch(path)
+    finally:
+        f.close()
+        if watch is not None:
+            os.close(watch)
+
+
 def backend_status() -> int:
     pid, pid_path = _read_any_pidfile()
     listeners = _find_listening_pids(5123)
     if not pid:
-        print(f"[STATUS] backend: not running (pidfile missing: {BACKEND_PID_FILE})")
+        print(f"[STATUS] backend: not running (no live pidfile: {BACKEND_PID_FILE})")
         if listeners:
             print(f"[WARN] port 5123 is in use by pid(s): {listeners}")
         return 1
@@ -273,11 +590,15 @@ def backend_stop(grace_seconds: float = 10.0) -> int:
         if pid:
             print(f"[INFO] backend pidfile exists but process not running (pid={pid})")
         else:
-            print(f"[INFO] backend not running (no pidfile: {BACKEND_PID_FILE})")
+            print(f"[INFO] backend not running (no live pidfile: {BACKEND_PID_FILE})")
 
     deadline = time.time() + grace_seconds
+    exited = bool(pid) and _wait_pid_exit(pid, grace_seconds) is True
+    if exited:
+        # One listener re-check instead of polling (children may still hold the port).
+        listeners = _find_listening_pids(5123)
     while time.time() < deadline:
-        if not listeners and not (pid and _pid_is_running(pid)):
+        if not listeners and (exited or not (pid and _pid_is_running(pid))):
             break
         listeners = _find_listening_pids(5123)
         time.sleep(0.2)
@@ -309,6 +630,8 @@ def backend_stop(grace_seconds: float = 10.0) -> int:
 
 
 def start_backend_daemon() -> int:
+    import subprocess
+
     pid, pid_path = _read_any_pidfile()
     if pid and _pid_is_running(pid):
         print(f"[INFO] backend already running (pid={pid})")
@@ -322,25 +645,38 @@ def start_backend_daemon() -> int:
         print(f"[ERROR] port 5123 already in use (pid(s)={listeners}); stop it first")
         return 1
 
-    BACKEND_DAEMON_LOG.parent.mkdir(parents=True, exist_ok=True)
     env = _make_backend_env()
     # Keep reload toggle single-sourced from `.env` / env var. Daemon + reload is unsafe.
     if str(env.get("RELOAD", "false")).lower() in ("true", "1", "yes"):
         print("[ERROR] RELOAD=true is not supported in --daemon mode; run foreground instead.")
         return 1
 
-    with BACKEND_DAEMON_LOG.open("a", encoding="utf-8") as lf:
-        lf.write(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] starting backend (daemon)\n")
-        lf.flush()
-        process = subprocess.Popen(
-            [sys.executable, "-m", "ah32.server.main"],
-            env=env,
-            stdout=lf,
-            stderr=subprocess.STDOUT,
-            start_new_session=True,
+    try:
+        lock_fd = _claim_pidfile(BACKEND_PID_FILE)
+    except OSError as e:
+        print(
+            f"[ERROR] pidfile {BACKEND_PID_FILE} is locked by a running backend ({e}); "
+            "stop it first"
         )
+        return 1
 
-    _write_pidfile(BACKEND_PID_FILE, process.pid)
+    try:
+        with BACKEND_DAEMON_LOG.open("a", encoding="utf-8") as lf:
+            lf.write(f"\n[{_now()}] starting backend (daemon)\n")
+            lf.flush()
+            # The child inherits the locked pidfile fd: the lock lives as long as the backend.
+            process = subprocess.Popen(
+                [sys.executable, "-m", "ah32.server.main"],
+                env=env,
+                stdout=lf,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+                pass_fds=() if lock_fd is None else (lock_fd,),
+            )
+        _write_pidfile(BACKEND_PID_FILE, process.pid, lock_fd)
+    finally:
+        if lock_fd is not None:
+            os.close(lock_fd)
     print(f"[OK] backend daemon started (pid={process.pid})")
     print(f"[INFO] pidfile: {BACKEND_PID_FILE}")
     print(f"[INFO] log:    {BACKEND_DAEMON_LOG}")
@@ -349,8 +685,10 @@ def start_backend_daemon() -> int:
 
 def start_backend_foreground() -> subprocess.Popen | None:
     """Start backend and stream logs to console and file (foreground)."""
+    import subprocess
+
     service = "backend"
-    write_log(service, f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting backend service")
+    write_log(service, f"\n[{_now()}] Starting backend service")
 
     env = _make_backend_env()
     try:
@@ -367,19 +705,7 @@ def start_backend_foreground() -> subprocess.Popen | None:
         print(f"[OK] Backend started on port 5123 (PID: {process.pid})")
         print(f"[INFO] Log file: {BACKEND_LOG}")
 
-        def log_output():
-            try:
-                assert process.stdout is not None
-                for line in iter(process.stdout.readline, ""):
-                    if line:
-                        msg = f"[BACKEND] {line.strip()}"
-                        write_log(service, msg)
-                        print(msg)
-            except Exception as e:
-                write_log(service, f"[BACKEND] Log read error: {e}")
-
-        thread = threading.Thread(target=log_output, daemon=True)
-        thread.start()
+        _follow_output(service, process)
         return process
     except Exception as e:
         print(f"[ERROR] Backend failed: {e}")
@@ -387,32 +713,197 @@ def start_backend_foreground() -> subprocess.Popen | None:
         return None
 
 
+# Absolute: the writer thread opens these lazily, possibly while start_frontend/start_wps_debug
+# have the main thread chdir'ed into the UI directory.
+_LOG_FILES = {
+    "backend": BACKEND_LOG.absolute(),
+    "frontend": FRONTEND_LOG.absolute(),
+    "wps": WPS_LOG.absolute(),
+}
+# Reader threads hand lines to one writer thread, which keeps the log files open and
+# writes whatever has queued up (up to _LOG_BATCH lines) with a single flush per file.
+_LOG_QUEUE: "queue.Queue[tuple[str, str] | None]" = queue.Queue()
+_LOG_BATCH = 512
+_log_writer: threading.Thread | None = None
+_log_writer_lock = threading.Lock()
+
+
 def write_log(service, message):
-    """Write to service-specific log file"""
-    LOG_DIR.mkdir(exist_ok=True)
+    """Write to service-specific log file (queued; flushed by the background log writer)"""
+    if service not in _LOG_FILES:
+        return
+    if _log_writer is None:
+        _start_log_writer()
+    _LOG_QUEUE.put_nowait((service, message))
+
+
+def _start_log_writer() -> None:
+    global _log_writer
+    with _log_writer_lock:
+        if _log_writer is None:
+            _log_writer = threading.Thread(target=_log_writer_loop, name="log-writer", daemon=True)
+            _log_writer.start()
+            atexit.register(_stop_log_writer)
+
+
+def _stop_log_writer() -> None:
+    """Drain queued lines and close the log files (atexit)."""
+    _LOG_QUEUE.put(None)
+    if _log_writer is not None:
+        _log_writer.join(timeout=2.0)
+
+
+def _log_writer_loop() -> None:
+    handles: dict = {}
     try:
-        if service == 'backend':
-            with open(BACKEND_LOG, 'a', encoding='utf-8') as f:
-                f.write(f"{message}\n")
-        elif service == 'frontend':
-            with open(FRONTEND_LOG, 'a', encoding='utf-8') as f:
-                f.write(f"{message}\n")
-        elif service == 'wps':
-            with open(WPS_LOG, 'a', encoding='utf-8') as f:
-                f.write(f"{message}\n")
+        stop = False
+        while not stop:
+            batch = [_LOG_QUEUE.get()]
+            while len(batch) < _LOG_BATCH:
+                try:
+                    batch.append(_LOG_QUEUE.get_nowait())
+                except queue.Empty:
+                    break
+            stop = _write_log_batch(handles, batch)
+    finally:
+        for f in handles.values():
+            try:
+                f.close()
+            except Exception as e:
+                print(f"Log close failed: {e}")
+
+
+def _write_log_batch(handles: dict, batch: list) -> bool:
+    """Append one batch of (service, message) lines; True once the stop marker was seen."""
+    stop = False
+    touched = set()
+    for item in batch:
+        if item is None:
+            stop = True
+            continue
+        service, message = item
+        try:
+            f = handles.get(service)
+            if f is None:
+                f = open(_LOG_FILES[service], 'a', encoding='utf-8', buffering=64 * 1024)
+                handles[service] = f
+            f.write(f"{message}\n")
+            touched.add(service)
+        except Exception as e:
+            print(f"Log write failed: {e}")
+    for service in touched:
+        try:
+            handles[service].flush()
+        except Exception as e:
+            print(f"Log write failed: {e}")
+    return stop
+
+
+_LOG_LABELS = {"backend": "[BACKEND]", "frontend": "[FRONTEND]", "wps": "[WPS]"}
+# Set by _claim_output_pump(): child stdout is then multiplexed on the main thread, which
+# must keep calling _pump_outputs. Until then (other callers of the start_* functions, and
+# always on Windows, whose pipes are not selectable) each stream gets a reader thread.
+_OUTPUT_SELECTOR: selectors.BaseSelector | None = None
+
+
+def _claim_output_pump() -> None:
+    """Route child output through _pump_outputs; the caller's loop must pump it from now on."""
+    global _OUTPUT_SELECTOR
+    if _OUTPUT_SELECTOR is None and not _IS_WINDOWS:
+        _OUTPUT_SELECTOR = selectors.DefaultSelector()
+
+
+def _emit_output_line(service: str, line: str) -> None:
+    msg = f"{_LOG_LABELS[service]} {line.strip()}"
+    write_log(service, msg)
+    print(msg)
+
+
+def _follow_output(service: str, process: subprocess.Popen) -> None:
+    """Stream a child's stdout to console + service log."""
+    assert process.stdout is not None
+    if _OUTPUT_SELECTOR is None:
+        threading.Thread(target=_pump_lines, args=(service, process.stdout), daemon=True).start()
+        return
+    # Same decoding as the text-mode pipe: UTF-8 with replacement, universal newlines.
+    utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    decoder = io.IncrementalNewlineDecoder(utf8, translate=True)
+    state = (service, decoder, [""])
+    _OUTPUT_SELECTOR.register(process.stdout.fileno(), selectors.EVENT_READ, state)
+
+
+def _pump_lines(service: str, stream) -> None:
+    try:
+        for line in iter(stream.readline, ""):
+            if line:
+                _emit_output_line(service, line)
     except Exception as e:
-        print(f"Log write failed: {e}")
+        write_log(service, f"{_LOG_LABELS[service]} Log read error: {e}")
+
+
+def _pump_outputs(timeout: float = 1.0) -> None:
+    """Wait up to <timeout> for child output and emit every complete line (main thread)."""
+    if _OUTPUT_SELECTOR is None:
+        time.sleep(timeout)
+        return
+    for key, _ in _OUTPUT_SELECTOR.select(timeout=timeout):
+        service, decoder, pending = key.data
+        try:
+            data = os.read(key.fd, 65536)
+        except OSError as e:
+            write_log(service, f"{_LOG_LABELS[service]} Log read error: {e}")
+            data = b""
+        lines = (pending[0] + decoder.decode(data, final=not data)).split("\n")
+        pending[0] = lines.pop()
+        for line in lines:
+            _emit_output_line(service, line)
+        if not data:
+            if pending[0]:
+                _emit_output_line(service, pending[0])
+            _OUTPUT_SELECTOR.unregister(key.fd)
+
 
 def start_backend():
     """Start backend service"""
     return start_backend_foreground() is not None
 
+# Node toolchain probes (nvm4w layout on Windows; plain `npm` on PATH otherwise).
+NPM_PATHS = (
+    r"C:\nvm4w\nodejs\npm.cmd",
+    r"C:\nvm4w\nodejs\npm",
+    r"C:\nvm4w\nodejs\bin\npm.cmd",
+    "npm",
+)
+NODE_EXE = r"C:\nvm4w\nodejs\node.exe"
+WPSJS_MAIN = "./node_modules/wpsjs/src/index.js"
+
+
+@lru_cache(maxsize=1)
+def _npm_cmd() -> str:
+    return next(p for p in NPM_PATHS if p == "npm" or os.path.exists(p))
+
+
+@lru_cache(maxsize=1)
+def _node_exe_exists() -> bool:
+    return os.path.exists(NODE_EXE)
+
+
+@lru_cache(maxsize=1)
+def _frontend_env() -> dict:
+    """Frontend subprocess env, built once; callers get copies."""
+    env = os.environ.copy()
+    env["PATH"] = r"C:\nvm4w\nodejs\bin;" + env.get("PATH", "")
+    env["NODE_PATH"] = r"C:\nvm4w\nodejs"
+    return env
+
 def start_frontend():
     """Start frontend service"""
+    import subprocess
+
     service = 'frontend'
-    write_log(service, f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting frontend service")
+    write_log(service, f"\n[{_now()}] Starting frontend service")
     original_dir = Path.cwd()
-    bid_ui_dir = Path.cwd() / "ah32-ui-next"
+    bid_ui_dir = original_dir / "ah32-ui-next"
 
     # Check if ah32-ui-next directory exists
     if not bid_ui_dir.exists():
@@ -424,36 +915,15 @@ def start_frontend():
     os.chdir(bid_ui_dir)
 
     # Fix npm path
-    npm_paths = [
-        r"C:\nvm4w\nodejs\npm.cmd",
-        r"C:\nvm4w\nodejs\npm",
-        r"C:\nvm4w\nodejs\bin\npm.cmd",
-        "npm"
-    ]
-    npm_cmd = None
-    for path in npm_paths:
-        if os.path.exists(path) or path == "npm":
-            npm_cmd = path
-            write_log(service, f"[INFO] Using npm: {npm_cmd}")
-            break
-
-    if not npm_cmd:
-        error_msg = f"[ERROR] npm not found. Tried paths: {npm_paths}"
-        print(error_msg)
-        write_log(service, error_msg)
-        return False
+    npm_cmd = _npm_cmd()
+    write_log(service, f"[INFO] Using npm: {npm_cmd}")
 
     write_log(service, f"[INFO] Current directory: {os.getcwd()}")
 
-    # Set environment variables
-    env = os.environ.copy()
-    env["PATH"] = r"C:\nvm4w\nodejs\bin;" + env.get("PATH", "")
-    env["NODE_PATH"] = r"C:\nvm4w\nodejs"
-
     try:
         process = subprocess.Popen(
             [npm_cmd, "run", "dev"],
-            env=env,
+            env=dict(_frontend_env()),
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             text=True,
@@ -464,19 +934,7 @@ def start_frontend():
         print(f"[OK] Frontend started on port 3889 (PID: {process.pid})")
         print(f"[INFO] Log file: {FRONTEND_LOG}")
 
-        # Read output in new thread and write to log
-        def log_output():
-            try:
-                for line in iter(process.stdout.readline, ''):
-                    if line:
-                        msg = f"[FRONTEND] {line.strip()}"
-                        write_log(service, msg)
-                        print(msg)
-            except Exception as e:
-                write_log(service, f"[FRONTEND] Log read error: {e}")
-
-        thread = threading.Thread(target=log_output, daemon=True)
-        thread.start()
+        _follow_output(service, process)
         return True
     except FileNotFoundError:
         error_msg = "[ERROR] npm not found. Please install Node.js"
@@ -493,10 +951,12 @@ def start_frontend():
 
 def start_wps_debug():
     """Start WPS debug"""
+    import subprocess
+
     service = 'wps'
-    write_log(service, f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting WPS debug")
+    write_log(service, f"\n[{_now()}] Starting WPS debug")
     original_dir = Path.cwd()
-    bid_ui_dir = Path.cwd() / "ah32-ui-next"
+    bid_ui_dir = original_dir / "ah32-ui-next"
 
     if not bid_ui_dir.exists():
         error_msg = f"[ERROR] ah32-ui-next directory not found: {bid_ui_dir}"
@@ -506,8 +966,8 @@ def start_wps_debug():
 
     os.chdir(bid_ui_dir)
 
-    wpsjs_main = "./node_modules/wpsjs/src/index.js"
-    node_exe = r"C:\nvm4w\nodejs\node.exe"
+    wpsjs_main = WPSJS_MAIN
+    node_exe = NODE_EXE
 
     if not os.path.exists(wpsjs_main):
         error_msg = f"[ERROR] wpsjs main file not found: {wpsjs_main}"
@@ -515,7 +975,7 @@ def start_wps_debug():
         write_log(service, error_msg)
         return False
 
-    if not os.path.exists(node_exe):
+    if not _node_exe_exists():
         error_msg = f"[ERROR] Node.js not found: {node_exe}"
         print(error_msg)
         write_log(service, error_msg)
@@ -537,19 +997,7 @@ def start_wps_debug():
         print(f"[OK] WPS debug started (PID: {process.pid})")
         print(f"[INFO] Log file: {WPS_LOG}")
 
-        # Read output in new thread and write to log
-        def log_output():
-            try:
-                for line in iter(process.stdout.readline, ''):
-                    if line:
-                        msg = f"[WPS] {line.strip()}"
-                        write_log(service, msg)
-                        print(msg)
-            except Exception as e:
-                write_log(service, f"[WPS] Log read error: {e}")
-
-        thread = threading.Thread(target=log_output, daemon=True)
-        thread.start()
+        _follow_output(service, process)
         return True
     except FileNotFoundError:
         error_msg = "[ERROR] wpsjs not found. Please install: npm install -g wpsjs"
@@ -564,10 +1012,16 @@ def start_wps_debug():
     finally:
         os.chdir(original_dir)
 
+SERVICE_STARTERS = {
+    'backend': start_backend_foreground,
+    'frontend': start_frontend,
+    'wps': start_wps_debug,
+}
+
+
 def main():
     log_mode = 'auto'
     services = []
-    service_threads = []
     daemon_mode = False
     action = None  # stop/status/tail
 
@@ -671,29 +1125,24 @@ def main():
     print(f"\nAh32 Starting: {', '.join(services)}")
     print("-" * 50)
 
-    # Start services in parallel
+    # Start services (each start only spawns the child; output is pumped below)
+    _claim_output_pump()
     started_processes: list[subprocess.Popen] = []
-    for service in services:
-        def start_service_in_thread(service_name):
-            try:
-                if service_name == 'backend':
-                    p = start_backend_foreground()
-                    if p is not None:
-                        started_processes.append(p)
-                elif service_name == 'frontend':
-                    start_frontend()
-                elif service_name == 'wps':
-                    start_wps_debug()
-            except Exception as e:
-                print(f"\n[ERROR] Service {service_name} error: {e}")
-                write_log(service_name, f"Service error: {e}")
-
-        thread = threading.Thread(target=start_service_in_thread, args=(service,), daemon=True)
-        service_threads.append(thread)
-        thread.start()
-        time.sleep(0.5)  # Small delay between starts
-
-    print(f"\n[OK] Started {len(service_threads)} services")
+    for service_name in services:
+        try:
+            result = SERVICE_STARTERS[service_name]()
+            # Only the backend starter hands back its Popen (stopped on Ctrl+C below).
+            if service_name == 'backend' and result is not None:
+                started_processes.append(result)
+        except Exception as e:
+            print(f"\n[ERROR] Service {service_name} error: {e}")
+            write_log(service_name, f"Service error: {e}")
+        # Small delay between starts
+        deadline = time.time() + 0.5
+        while time.time() < deadline:
+            _pump_outputs(max(0.0, deadline - time.time()))
+
+    print(f"\n[OK] Started {len(services)} services")
     print(f"Logs:")
     print(f"  Backend:  {BACKEND_LOG}")
     print(f"  Frontend: {FRONTEND_LOG}")
@@ -701,10 +1150,10 @@ def main():
     print("\nPress Ctrl+C to stop all services")
     sys.stdout.flush()
 
-    # Keep main thread running
+    # Keep main thread running, relaying child output
     try:
         while True:
-            time.sleep(1)
+            _pump_outputs()
     except KeyboardInterrupt:
         print("\n\n[INFO] Stopping all services...")
         # Best-effort stop children (they are started in new sessions, so Ctrl+C won't reach them).
@@ -713,7 +1162,7 @@ def main():
                 p.terminate()
             except Exception:
                 pass
-        write_log('backend', f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Services stopped")
+        write_log('backend', f"[{_now()}] Services stopped")
 
 if __name__ == "__main__":
     main()